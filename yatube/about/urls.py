@@ -1,10 +1,13 @@
 from django.urls import path
 
+from yatube.async_utils import async_view
+
 from . import views
 
 app_name = 'about'
 
 urlpatterns = [
-    path('author/', views.AboutAuthorView.as_view(), name='author'),
-    path('tech/', views.AboutTechView.as_view(), name='tech'),
+    path('author/', async_view(views.AboutAuthorView.as_view()),
+         name='author'),
+    path('tech/', async_view(views.AboutTechView.as_view()), name='tech'),
 ]
@@ -0,0 +1,110 @@
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Follow
+
+from .models import DigestRun
+
+User = get_user_model()
+
+DIGEST_SUBJECT = 'Новые записи авторов, на которых вы подписаны'
+
+
+def get_run():
+    """Незавершённый запуск, если прошлый прервался, иначе новый - за
+    период с конца прошлого."""
+    last_run = DigestRun.objects.first()
+    if last_run is not None and not last_run.finished:
+        return last_run
+    end = timezone.now()
+    if last_run is None:
+        start = end - timedelta(seconds=settings.DIGEST_PERIOD)
+    else:
+        start = last_run.period_end
+    return DigestRun.objects.create(period_start=start, period_end=end)
+
+
+def iter_recipient_chunks(start, end, chunk_size, after=0):
+    recipients = User.objects.filter(
+        pk__gt=after,
+        follower__author__posts__pub_date__gt=start,
+        follower__author__posts__pub_date__lte=end,
+        follower__author__posts__is_deleted=False,
+    ).exclude(email='').values_list('pk', flat=True).distinct().order_by('pk')
+    chunk = []
+    for pk in recipients.iterator():
+        chunk.append(pk)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def get_digest_rows(user_ids, start, end):
+    """Новые записи всех авторов, на которых подписаны user_ids, одним
+    запросом по Follow."""
+    return Follow.objects.filter(
+        user_id__in=user_ids,
+        author__posts__pub_date__gt=start,
+        author__posts__pub_date__lte=end,
+        author__posts__is_deleted=False,
+    ).values_list(
+        'user_id', 'user__email', 'user__username', 'author__username',
+        'author__posts__id', 'author__posts__text',
+    ).order_by('user_id', 'author__username', '-author__posts__pub_date')
+
+
+def build_messages(rows):
+    for (user_id, email, username), user_rows in groupby(
+            rows, key=lambda row: row[:3]):
+        authors = []
+        for author, author_rows in groupby(user_rows, key=lambda row: row[3]):
+            posts = [
+                {
+                    'text': text[:200],
+                    'url': settings.SITE_URL + reverse(
+                        'post', args=[author, post_id]
+                    ),
+                }
+                for *_, post_id, text in author_rows
+            ]
+            authors.append({'username': author, 'posts': posts})
+        body = render_to_string(
+            'notifications/digest.txt',
+            {'username': username, 'authors': authors},
+        )
+        yield EmailMessage(DIGEST_SUBJECT, body, to=[email])
+
+
+def send_digests(chunk_size=None):
+    """Отправляет сводки за период с прошлого запуска.
+
+    Получатели читаются порциями по chunk_size; на порцию приходится один
+    запрос к Follow и одно соединение с почтовым сервером. После каждой
+    порции запуск запоминает последнего получателя, поэтому при сбое
+    повторный запуск не пишет тем, кому сводка уже ушла.
+    """
+    chunk_size = chunk_size or settings.DIGEST_CHUNK_SIZE
+    run = get_run()
+    start, end = run.period_start, run.period_end
+    sent = 0
+    for user_ids in iter_recipient_chunks(
+            start, end, chunk_size, run.last_user_id):
+        messages = list(build_messages(get_digest_rows(user_ids, start, end)))
+        with get_connection() as connection:
+            chunk_sent = connection.send_messages(messages) or 0
+        sent += chunk_sent
+        run.recipients += chunk_sent
+        run.last_user_id = user_ids[-1]
+        run.save(update_fields=['recipients', 'last_user_id'])
+    run.finished = True
+    run.save(update_fields=['finished'])
+    return sent
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from notifications.digest import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Рассылает подписчикам сводку новых записей авторов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        sent = send_digests(options['chunk_size'])
+        self.stdout.write(f'Отправлено писем: {sent}')
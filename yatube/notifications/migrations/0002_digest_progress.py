@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-19 03:20
+
+from django.db import migrations, models
+
+
+def finish_existing_runs(apps, schema_editor):
+    # Запуски до этой миграции завершены, иначе их начали бы заново
+    apps.get_model('notifications', 'DigestRun').objects.update(
+        finished=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='digestrun',
+            name='finished',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='digestrun',
+            name='last_user_id',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(finish_existing_runs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class DigestRun(models.Model):
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField(db_index=True)
+    recipients = models.PositiveIntegerField(default=0)
+    # Прогресс: сводки получателям с pk <= last_user_id уже отправлены.
+    # Незавершённый запуск продолжается с этого места, а не заново
+    last_user_id = models.PositiveIntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-period_end']
+
+    def __str__(self):
+        return f'{self.period_start:%d.%m.%Y %H:%M} - {self.period_end:%H:%M}'
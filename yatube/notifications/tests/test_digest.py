@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from notifications.digest import get_digest_rows, send_digests
+from notifications.models import DigestRun
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class DigestTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(
+            username='reader', email='reader@yatube.ru'
+        )
+        cls.no_email = User.objects.create_user(username='no_email')
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        Follow.objects.create(user=cls.no_email, author=cls.author)
+        cls.post = Post.objects.create(text='Новая запись', author=cls.author)
+        Post.objects.create(text='Чужая запись', author=cls.other)
+
+    def test_one_message_per_recipient(self):
+        Post.objects.create(text='Ещё одна запись', author=self.author)
+        sent = send_digests(chunk_size=1)
+        self.assertEqual(sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ['reader@yatube.ru'])
+        self.assertIn('Новая запись', message.body)
+        self.assertIn('Ещё одна запись', message.body)
+        self.assertNotIn('Чужая запись', message.body)
+        self.assertIn(f'/author/{self.post.id}/', message.body)
+
+    def test_deleted_posts_skipped(self):
+        Post.objects.create(text='Скрытая запись', author=self.author)
+        Post.objects.filter(text='Скрытая запись').update(is_deleted=True)
+        send_digests()
+        self.assertNotIn('Скрытая запись', mail.outbox[0].body)
+        self.assertIn('Новая запись', mail.outbox[0].body)
+
+    def test_next_run_starts_after_previous(self):
+        send_digests()
+        mail.outbox.clear()
+        self.assertEqual(send_digests(), 0)
+        self.assertEqual(DigestRun.objects.count(), 2)
+
+    def test_interrupted_run_resumes_after_last_chunk(self):
+        second = User.objects.create_user(
+            username='second', email='second@yatube.ru'
+        )
+        Follow.objects.create(user=second, author=self.author)
+        send_messages = mail.get_connection().__class__.send_messages
+        calls = []
+
+        def fail_second_chunk(connection, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise OSError('SMTP недоступен')
+            return send_messages(connection, messages)
+
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            fail_second_chunk,
+        ), self.assertRaises(OSError):
+            send_digests(chunk_size=1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(send_digests(chunk_size=1), 1)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['reader@yatube.ru', 'second@yatube.ru'],
+        )
+        self.assertEqual(DigestRun.objects.count(), 1)
+
+    def test_rows_single_query(self):
+        end = timezone.now()
+        start = end - timedelta(days=1)
+        with self.assertNumQueries(1):
+            rows = list(get_digest_rows([self.reader.pk], start, end))
+        self.assertEqual(len(rows), 1)
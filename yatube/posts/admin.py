@@ -1,16 +1,204 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 
 from .models import Group, Post, Comment, Follow
+from .signals import post_edited, posts_changed
 
+# Сколько подписок удаляет один DELETE действия delete_follows
+FOLLOW_DELETE_BATCH = 1000
 
-class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author')
+
+class EstimatedCountPaginator(Paginator):
+    """Для большой таблицы без фильтров берёт оценку числа строк из
+    статистики PostgreSQL вместо COUNT(*) по всей таблице."""
+    threshold = 100000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.threshold:
+                return int(row[0])
+        return super().count
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class AllObjectsAdmin(ScalableAdmin):
+    """Админка показывает и скрытые строки: менеджер по умолчанию их
+    отфильтровывает, поэтому выборка строится на all_objects с
+    сортировкой, которую выбрал ModelAdmin."""
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return self.model.all_objects.order_by(*queryset.query.order_by)
+
+
+class PostAdminForm(forms.ModelForm):
+    # Версия записи на момент открытия формы: правка проходит, только если
+    # запись с тех пор не меняли, как и в post_edit
+    seen_version = forms.IntegerField(
+        widget=forms.HiddenInput, required=False
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['seen_version'].initial = self.instance.version
+
+    def clean(self):
+        cleaned_data = super().clean()
+        version = cleaned_data.get('seen_version')
+        if self.instance.pk and version != self.instance.version:
+            raise forms.ValidationError(
+                'Запись изменили, пока вы её редактировали. '
+                'Откройте её заново.'
+            )
+        return cleaned_data
+
+
+class PostAdmin(AllObjectsAdmin):
+    form = PostAdminForm
+    list_display = ('pk', 'text', 'pub_date', 'author', 'group', 'is_deleted')
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_filter = ('pub_date', 'is_deleted')
+    date_hierarchy = 'pub_date'
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('group',)
     empty_value_display = '-пусто-'
+    actions = ('soft_delete', 'restore')
+    # Счётчики и служебные поля ведут задачи и save_changes: форма, открытая
+    # до их обновления, не должна их перезаписывать
+    readonly_fields = (
+        'views_count', 'likes_count', 'like_shards', 'trending_score',
+        'thumbnail', 'thumbnail_width', 'thumbnail_height',
+        'thumbnail_variants', 'version',
+    )
+
+    def save_model(self, request, obj, form, change):
+        """Правка пишет только изменённые поля через save_changes."""
+        if not change:
+            super().save_model(request, obj, form, change)
+            return
+        changed = [
+            name for name in form.changed_data if name != 'seen_version'
+        ]
+        if not changed:
+            return
+        if not obj.save_changes(changed, form.cleaned_data['seen_version']):
+            self.message_user(
+                request, 'Запись изменили, пока вы её редактировали: '
+                'правка не сохранена.', messages.ERROR
+            )
+            return
+        post_edited.send(sender=Post, instance=obj, changed=changed)
+        posts_changed.send(
+            sender=Post, post_ids={obj.pk},
+            author_ids={obj.author_id, form.initial.get('author')} - {None},
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        """Номер записи и @автор ищутся по индексу; LIKE по тексту -
+        только для остальных запросов."""
+        term = search_term.strip()
+        if term.isdigit():
+            return queryset.filter(pk=term), False
+        if term.startswith('@'):
+            return queryset.filter(author__username=term[1:]), False
+        return super().get_search_results(request, queryset, search_term)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def set_deleted(self, queryset, is_deleted):
+        """update() не вызывает post_save, поэтому кэши карточек и лент
+        сбрасываются сигналом posts_changed."""
+        rows = list(queryset.values_list('pk', 'author_id'))
+        updated = queryset.update(is_deleted=is_deleted)
+        posts_changed.send(
+            sender=Post,
+            post_ids={pk for pk, _ in rows},
+            author_ids={author_id for _, author_id in rows},
+        )
+        return updated
+
+    @admin.action(description='Скрыть выбранные записи')
+    def soft_delete(self, request, queryset):
+        updated = self.set_deleted(queryset, True)
+        self.message_user(request, f'Скрыто записей: {updated}')
+
+    @admin.action(description='Вернуть выбранные записи')
+    def restore(self, request, queryset):
+        updated = self.set_deleted(queryset, False)
+        self.message_user(request, f'Возвращено записей: {updated}')
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', 'slug')
+
+
+class CommentAdmin(AllObjectsAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post', 'is_deleted')
+    list_select_related = ('author', 'post')
+    search_fields = ('=id', '=author__username', '=post__id')
+    list_filter = ('is_deleted',)
+    raw_id_fields = ('author', 'post')
+    actions = ('soft_delete',)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(description='Скрыть выбранные комментарии')
+    def soft_delete(self, request, queryset):
+        updated = queryset.update(is_deleted=True)
+        self.message_user(request, f'Скрыто комментариев: {updated}')
+
+
+class FollowAdmin(ScalableAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    search_fields = ('=user__username', '=author__username')
+    raw_id_fields = ('user', 'author')
+    actions = ('delete_follows',)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(description='Удалить выбранные подписки')
+    def delete_follows(self, request, queryset):
+        """Удаляет пачками по FOLLOW_DELETE_BATCH: delete() отправляет
+        сигналы, которые сбрасывают карточки авторов, а транзакции
+        остаются короткими."""
+        pks = list(queryset.values_list('pk', flat=True))
+        deleted = 0
+        for start in range(0, len(pks), FOLLOW_DELETE_BATCH):
+            batch = pks[start:start + FOLLOW_DELETE_BATCH]
+            deleted += Follow.objects.filter(pk__in=batch).delete()[0]
+        self.message_user(request, f'Удалено подписок: {deleted}')
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
-admin.site.register(Comment)
-admin.site.register(Follow)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
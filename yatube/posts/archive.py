@@ -0,0 +1,177 @@
+"""Архив старых записей.
+
+Записи старше ARCHIVE_AFTER вместе с комментариями пачками переносятся в
+таблицы ArchivedPost и ArchivedComment командой archive_posts; удалённые
+записи старше этого срока удаляются окончательно. Основная таблица
+остаётся небольшой, а ленты профиля и сообщества обращаются к архиву,
+только когда страница выходит за пределы свежих записей.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .likes import get_shard_totals
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+from .signals import posts_changed
+
+GENERATION_KEY = 'archive:generation'
+
+
+def get_generation():
+    return cache.get_or_set(GENERATION_KEY, 1, None)
+
+
+def bump_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, None)
+
+
+def archive_batch(posts):
+    # Отметки уходят вместе с записью, в архиве остаётся только их число
+    shard_totals = get_shard_totals(
+        [post.pk for post in posts if post.like_shards]
+    )
+    ArchivedPost.objects.bulk_create(
+        ArchivedPost(
+            id=post.id, text=post.text, pub_date=post.pub_date,
+            author_id=post.author_id, group_id=post.group_id,
+            image=post.image.name, thumbnail=post.thumbnail,
+            thumbnail_width=post.thumbnail_width,
+            thumbnail_height=post.thumbnail_height,
+            thumbnail_variants=post.thumbnail_variants,
+            views_count=post.views_count,
+            likes_count=post.likes_count + shard_totals.get(post.pk, 0),
+        )
+        for post in posts
+    )
+    ArchivedComment.objects.bulk_create(
+        ArchivedComment(
+            id=comment.id, text=comment.text, created=comment.created,
+            author_id=comment.author_id, post_id=comment.post_id,
+        )
+        for comment in Comment.objects.filter(post__in=posts)
+    )
+    delete_posts(posts)
+
+
+def delete_posts(posts):
+    """Удаляет пачку записей без post_delete на каждую строку: зависимые
+    строки (все связи с записью - CASCADE) удаляются своими запросами,
+    записи - одним DELETE, а кэши карточек и лент сбрасываются одним
+    posts_changed на пачку."""
+    pks = [post.pk for post in posts]
+    for relation in Post._meta.related_objects:
+        relation.related_model._base_manager.filter(
+            **{f'{relation.field.name}__in': pks}
+        ).delete()
+    deleted = Post.all_objects.filter(pk__in=pks)
+    deleted._raw_delete(deleted.db)
+    posts_changed.send(
+        sender=Post, post_ids=set(pks),
+        author_ids={post.author_id for post in posts},
+    )
+
+
+def purge_deleted(cutoff, batch_size):
+    """Окончательно удаляет скрытые записи старше cutoff пачками, чтобы
+    не держать долгую блокировку и не собирать каскад целиком в памяти."""
+    deleted = Post.all_objects.filter(is_deleted=True, pub_date__lt=cutoff)
+    while True:
+        with transaction.atomic():
+            posts = list(deleted.only('author_id')[:batch_size])
+            if not posts:
+                return
+            delete_posts(posts)
+
+
+def archive_posts(cutoff=None, batch_size=500):
+    """Переносит в архив записи старше cutoff; возвращает их число."""
+    if cutoff is None:
+        cutoff = timezone.now() - timedelta(seconds=settings.ARCHIVE_AFTER)
+    purge_deleted(cutoff, batch_size)
+    moved = 0
+    while True:
+        with transaction.atomic():
+            posts = list(
+                Post.objects.filter(pub_date__lt=cutoff).order_by(
+                    'pub_date'
+                )[:batch_size]
+            )
+            if not posts:
+                break
+            archive_batch(posts)
+        moved += len(posts)
+    if moved:
+        bump_generation()
+    return moved
+
+
+class ArchivedFeed:
+    """Лента для Paginator: сначала записи из основной таблицы, затем
+    архив. Число архивных записей кэшируется до следующего archive_posts,
+    поэтому первые страницы архив не затрагивают вовсе."""
+
+    def __init__(self, posts, archived, key):
+        self.posts = posts
+        self.archived = archived
+        self.key = key
+
+    @cached_property
+    def hot_count(self):
+        return self.posts.count()
+
+    def archived_count(self):
+        key = f'archive:count:{get_generation()}:{self.key}'
+        count = cache.get(key)
+        if count is None:
+            count = self.archived.count()
+            cache.set(key, count, None)
+        return count
+
+    def count(self):
+        return self.hot_count + self.archived_count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        start, stop = index.start or 0, index.stop
+        hot = self.hot_count
+        items = []
+        if start < hot:
+            items.extend(self.posts[start:min(stop, hot)])
+        if stop > hot:
+            items.extend(self.archived[max(start - hot, 0):stop - hot])
+        return items
+
+
+def author_feed(author):
+    return ArchivedFeed(
+        Post.objects.for_feed().filter(author=author),
+        ArchivedPost.objects.select_related('author', 'group').filter(
+            author=author
+        ),
+        f'author:{author.pk}',
+    )
+
+
+def group_feed(group):
+    return ArchivedFeed(
+        Post.objects.for_feed().filter(group=group),
+        ArchivedPost.objects.select_related('author', 'group').filter(
+            group=group
+        ),
+        f'group:{group.pk}',
+    )
+
+
+def get_archived_post(username, post_id):
+    return ArchivedPost.objects.select_related('author', 'group').filter(
+        id=post_id, author__username=username
+    ).first()
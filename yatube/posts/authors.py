@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import ArchivedPost, Follow, Post, User
+
+
+def count_subquery(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(count=Count('pk')).values('count'),
+        output_field=IntegerField(),
+    ), 0)
+
+
+# В кэш попадают только эти поля, а не User с хэшем пароля и почтой
+CARD_FIELDS = ('id', 'username', 'first_name', 'last_name')
+COUNT_FIELDS = ('followers_count', 'followings_count', 'posts_count')
+
+
+def get_card_key(username):
+    return f'author_card:{username}'
+
+
+def get_author_card(username):
+    """Автор с followers_count, followings_count и posts_count.
+
+    Вычисляется одним запросом и хранится в кэше до подписки, отписки,
+    новой или удалённой записи автора. None, если автора нет.
+    """
+    key = get_card_key(username)
+    data = cache.get(key)
+    if data is None:
+        data = User.objects.filter(username=username).annotate(
+            followers_count=count_subquery(Follow, 'author'),
+            followings_count=count_subquery(Follow, 'user'),
+            posts_count=(
+                count_subquery(Post, 'author')
+                + count_subquery(ArchivedPost, 'author')
+            ),
+        ).values(*CARD_FIELDS, *COUNT_FIELDS).first()
+        if data is None:
+            return None
+        cache.set(key, data, settings.AUTHOR_CARD_TIMEOUT)
+    author = User(**{name: data[name] for name in CARD_FIELDS})
+    for name in COUNT_FIELDS:
+        setattr(author, name, data[name])
+    return author
+
+
+def invalidate_author_cards(*user_ids):
+    usernames = User.objects.filter(pk__in=user_ids).values_list(
+        'username', flat=True
+    )
+    cache.delete_many([get_card_key(username) for username in usernames])
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Ограничения частоты, буфер просмотров и флаги задач работают только
+    с кэшем, общим для веб-процессов, воркера и команд."""
+    if settings.CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES:
+        return [Warning(
+            'Кэш по умолчанию локален для процесса.',
+            hint='Задайте YATUBE_CACHE_BACKEND и YATUBE_CACHE_LOCATION '
+                 '(memcached).',
+            id='posts.W001',
+        )]
+    return []
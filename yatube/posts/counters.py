@@ -0,0 +1,152 @@
+"""Счётчик просмотров записей.
+
+Просмотр увеличивает счётчик в кэше атомарным incr, а не строку Post:
+UPDATE на каждый просмотр сериализует запись в SQLite и плодит мёртвые
+версии строк в PostgreSQL. id записи с непереданными просмотрами лежит
+в одной из DIRTY_SHARDS долей множества views:dirty:<n>, по которому
+flush_views одним UPDATE переносит накопленное в Post.views_count.
+Отметка проверяется при каждом просмотре, поэтому потерянная (долю
+вытеснили или два процесса переписали её одновременно) восстанавливается
+следующим просмотром записи. Кэш должен быть общим для веб-процессов и
+flush_views (см. posts.W001). Просмотры, не дошедшие до сброса, теряются
+при вытеснении из кэша - для счётчика это допустимо.
+"""
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import ArchivedPost, Post
+
+DIRTY_SHARDS = 16
+FLUSH_LOCK_KEY = 'views:flush:lock'
+BOT_RE = re.compile(r'bot|crawl|spider|slurp|preview', re.IGNORECASE)
+
+
+def get_delta_key(post_id):
+    return f'views:delta:{post_id}'
+
+
+def get_dirty_key(shard):
+    return f'views:dirty:{shard}'
+
+
+def incr(key, delta=1):
+    cache.add(key, 0, None)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Ключ вытеснили между add и incr
+        cache.set(key, delta, None)
+        return delta
+
+
+def mark_dirty(post_id):
+    key = get_dirty_key(post_id % DIRTY_SHARDS)
+    dirty = cache.get(key) or set()
+    if post_id not in dirty:
+        cache.set(key, dirty | {post_id}, None)
+
+
+def unmark_clean(post_ids):
+    """Снимает отметки записей, чьи просмотры перенесены целиком; если
+    просмотр пришёл, пока отметки снимались, запись отмечается снова."""
+    keys = [get_dirty_key(shard) for shard in range(DIRTY_SHARDS)]
+    cache.set_many({
+        key: dirty - post_ids
+        for key, dirty in cache.get_many(keys).items() if dirty & post_ids
+    }, None)
+    for key, delta in cache.get_many(
+        [get_delta_key(post_id) for post_id in post_ids]
+    ).items():
+        if delta:
+            mark_dirty(int(key.rsplit(':', 1)[1]))
+
+
+def get_visitor(request):
+    """Сессия посетителя, а без неё - адрес: боты обычно не хранят куки."""
+    session_key = getattr(request, 'session', None) and (
+        request.session.session_key
+    )
+    return session_key or request.META.get('REMOTE_ADDR', '')
+
+
+def is_new_view(request, post_id):
+    """Небольшое множество недавно просмотренных записей посетителя:
+    повторные открытия и перезагрузки не считаются. Хранится в кэше,
+    чтобы просмотр не сохранял сессию в базу."""
+    if BOT_RE.search(request.META.get('HTTP_USER_AGENT', '')):
+        return False
+    key = f'views:seen:{get_visitor(request)}'
+    seen = cache.get(key) or []
+    if post_id in seen:
+        return False
+    seen = [post_id] + seen[:settings.VIEWS_SEEN_SIZE - 1]
+    cache.set(key, seen, settings.VIEWS_SEEN_TIMEOUT)
+    return True
+
+
+def count_view(request, post):
+    """Учитывает просмотр; возвращает число просмотров с учётом
+    ещё не сброшенных в базу."""
+    if not is_new_view(request, post.pk):
+        return post.views_count + (cache.get(get_delta_key(post.pk)) or 0)
+    pending = incr(get_delta_key(post.pk))
+    mark_dirty(post.pk)
+    return post.views_count + pending
+
+
+def collect_deltas():
+    """Забирает из кэша накопленные просмотры: {id записи: прирост}.
+    Одновременно их забирает только один процесс: иначе два сброса
+    вычли бы и записали один прирост дважды."""
+    if not cache.add(FLUSH_LOCK_KEY, True, settings.VIEWS_FLUSH_LOCK_TIMEOUT):
+        return {}
+    try:
+        post_ids = set().union(*cache.get_many(
+            [get_dirty_key(shard) for shard in range(DIRTY_SHARDS)]
+        ).values())
+        deltas = {}
+        pending = set()
+        for key, delta in cache.get_many(
+            [get_delta_key(post_id) for post_id in post_ids]
+        ).items():
+            if not delta:
+                continue
+            post_id = int(key.rsplit(':', 1)[1])
+            deltas[post_id] = delta
+            # decr, а не delete: просмотры, пришедшие после get_many,
+            # остаются до следующего сброса
+            if cache.decr(key, delta) > 0:
+                pending.add(post_id)
+        unmark_clean(post_ids - pending)
+        return deltas
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def apply_deltas(deltas):
+    increment = Case(
+        *(When(pk=post_id, then=Value(delta))
+          for post_id, delta in deltas.items()),
+        default=Value(0), output_field=IntegerField(),
+    )
+    # Запись могла уйти в архив, пока просмотры копились в кэше
+    return sum(
+        model.filter(pk__in=deltas).update(
+            views_count=F('views_count') + increment
+        )
+        for model in (Post.all_objects, ArchivedPost.objects)
+    )
+
+
+def flush_views(batch_size=300):
+    """Переносит просмотры из кэша в базу: один UPDATE с CASE на пачку
+    записей (пачка держит число параметров запроса в пределах SQLite);
+    возвращает число обновлённых записей."""
+    items = list(collect_deltas().items())
+    return sum(
+        apply_deltas(dict(items[start:start + batch_size]))
+        for start in range(0, len(items), batch_size)
+    )
@@ -0,0 +1,172 @@
+"""RSS и Atom для всего сайта, сообществ и авторов.
+
+Ленты пишутся в ответ по одной записи (StreamingHttpResponse поверх
+queryset.iterator()), готовое тело кэшируется до следующей новой,
+изменённой, скрытой, удалённой или перенесённой в архив записи. ETag и
+Last-Modified вычисляются из поколения кэша без обращения к записям,
+поэтому опрос агрегатором неизменившейся ленты обходится ответом 304.
+"""
+import io
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.feedgenerator import (
+    Atom1Feed, Rss201rev2Feed, SimplerXMLGenerator
+)
+
+GENERATION_KEY = 'feeds:generation'
+
+
+def get_generation():
+    return cache.get_or_set(GENERATION_KEY, 1, None)
+
+
+def bump_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, None)
+
+
+def bump_generation_on_commit():
+    """Новое поколение - только после фиксации транзакции: иначе
+    параллельный запрос успеет закэшировать под ним старые записи. За
+    транзакцию смена поколения откладывается один раз.
+
+    Отложенный вызов запоминается на соединении слабой ссылкой: после
+    фиксации он снимает отметку сам, а при откате Django выбрасывает его
+    вместе с остальными, и ссылка умирает.
+    """
+    connection = transaction.get_connection()
+    pending = getattr(connection, 'feeds_bump_pending', None)
+    if pending is not None and pending() is not None:
+        return
+
+    def bump():
+        connection.feeds_bump_pending = None
+        bump_generation()
+
+    connection.feeds_bump_pending = weakref.ref(bump)
+    transaction.on_commit(bump)
+
+
+class StreamingFeedMixin:
+    item_tag = 'item'
+    last_modified = None
+
+    def latest_post_date(self):
+        return self.last_modified or super().latest_post_date()
+
+    def stream(self, items):
+        """Генератор фрагментов XML: заголовок, по фрагменту на запись,
+        окончание."""
+        buffer = io.BytesIO()
+
+        def flush():
+            data = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return data
+
+        handler = SimplerXMLGenerator(buffer, 'utf-8')
+        handler.startDocument()
+        self.start_feed(handler)
+        self.add_root_elements(handler)
+        yield flush()
+        for kwargs in items:
+            self.add_item(**kwargs)
+            item = self.items.pop()
+            handler.startElement(self.item_tag, self.item_attributes(item))
+            self.add_item_elements(handler, item)
+            handler.endElement(self.item_tag)
+            yield flush()
+        self.end_feed(handler)
+        yield flush()
+
+
+class RssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    def start_feed(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+
+    def end_feed(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class AtomFeed(StreamingFeedMixin, Atom1Feed):
+    item_tag = 'entry'
+
+    def start_feed(self, handler):
+        handler.startElement('feed', self.root_attributes())
+
+    def end_feed(self, handler):
+        handler.endElement('feed')
+
+
+FEED_TYPES = {'rss': RssFeed, 'atom': AtomFeed}
+
+
+def get_item(request, post):
+    link = request.build_absolute_uri(post.get_absolute_url())
+    return {
+        'title': post.text[:60],
+        'link': link,
+        'description': post.text,
+        'unique_id': link,
+        'pubdate': post.pub_date,
+        'author_name': post.author.username,
+        'categories': [post.group.title] if post.group_id else None,
+    }
+
+
+def get_cache_key(kind, key):
+    return f'feed:{get_generation()}:{kind}:{key}'
+
+
+def get_last_modified(kind, key, posts):
+    """Дата последней записи ленты; кэшируется вместе с поколением."""
+    cache_key = get_cache_key(kind, key) + ':modified'
+    modified = cache.get(cache_key)
+    if modified is None:
+        modified = posts.values_list('pub_date', flat=True).first() or ''
+        cache.set(cache_key, modified, settings.FEED_CACHE_TIMEOUT)
+    return modified or None
+
+
+def get_etag(kind, key):
+    return f'{get_generation()}-{kind}-{key}'
+
+
+def feed_response(request, kind, key, posts, title, link, description):
+    """Ответ с лентой: из кэша или потоком с сохранением в кэш."""
+    feed_class = FEED_TYPES[kind]
+    cache_key = get_cache_key(kind, key)
+    content_type = feed_class.content_type
+    body = cache.get(cache_key)
+    if body is not None:
+        return HttpResponse(body, content_type=content_type)
+    feed = feed_class(
+        title=title,
+        link=request.build_absolute_uri(link),
+        description=description,
+        feed_url=request.build_absolute_uri(),
+        language=settings.LANGUAGE_CODE,
+    )
+    feed.last_modified = get_last_modified(kind, key, posts)
+    items = (
+        get_item(request, post)
+        for post in posts[:settings.FEED_ITEMS].iterator(chunk_size=100)
+    )
+
+    def stream():
+        chunks = []
+        for chunk in feed.stream(items):
+            chunks.append(chunk)
+            yield chunk
+        cache.set(cache_key, b''.join(chunks), settings.FEED_CACHE_TIMEOUT)
+
+    return StreamingHttpResponse(stream(), content_type=content_type)
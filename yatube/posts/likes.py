@@ -0,0 +1,126 @@
+"""Отметки «нравится».
+
+Число отметок хранится в Post.likes_count, а не считается COUNT по Like
+для каждой карточки. У популярных записей (like_shards > 0) отметки
+раскладываются по строкам LikeShard, и compact_likes периодически
+сворачивает их в likes_count. Признак «нравится мне» для всей страницы
+ленты загружает attach_likes одним запросом.
+"""
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import Like, LikeShard, Post
+
+
+def add_likes(post, delta):
+    if post.like_shards:
+        updated = LikeShard.objects.filter(
+            post_id=post.pk, shard=random.randrange(post.like_shards)
+        ).update(count=F('count') + delta)
+        if updated:
+            return
+        # Части счётчика уже свернули, а post прочитан раньше
+    Post.all_objects.filter(pk=post.pk).update(
+        likes_count=F('likes_count') + delta
+    )
+
+
+def like_post(user, post):
+    """Ставит отметку; False, если она уже стояла."""
+    with transaction.atomic():
+        _, created = Like.objects.get_or_create(user=user, post=post)
+        if created:
+            add_likes(post, 1)
+    return created
+
+
+def unlike_post(user, post):
+    """Снимает отметку; False, если её не было."""
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user=user, post=post).delete()
+        if deleted:
+            add_likes(post, -1)
+    return bool(deleted)
+
+
+def get_shard_totals(post_ids):
+    return dict(
+        LikeShard.objects.filter(post_id__in=post_ids).order_by().values(
+            'post_id'
+        ).annotate(total=Sum('count')).values_list('post_id', 'total')
+    )
+
+
+def attach_likes(posts, user):
+    """Проставляет записям страницы liked и полное число отметок: один
+    запрос для «нравится мне» и ещё один, только если на странице есть
+    популярные записи со счётчиком по частям."""
+    posts = [post for post in posts if not post.is_archived]
+    sharded = [post.pk for post in posts if post.like_shards]
+    totals = get_shard_totals(sharded) if sharded else {}
+    liked = set()
+    if posts and user is not None and user.is_authenticated:
+        liked = set(Like.objects.filter(
+            user=user, post_id__in=[post.pk for post in posts]
+        ).values_list('post_id', flat=True))
+    for post in posts:
+        post.likes_count += totals.get(post.pk, 0)
+        post.liked = post.pk in liked
+
+
+def fold_shards(post_ids=None):
+    """Переносит суммы частей в likes_count и обнуляет части."""
+    with transaction.atomic():
+        shards = LikeShard.objects.select_for_update().exclude(count=0)
+        if post_ids is not None:
+            shards = shards.filter(post_id__in=post_ids)
+        # Без DISTINCT: PostgreSQL не допускает его с FOR UPDATE
+        totals = get_shard_totals(
+            set(shards.values_list('post_id', flat=True))
+        )
+        for post_id, total in totals.items():
+            Post.all_objects.filter(pk=post_id).update(
+                likes_count=F('likes_count') + total
+            )
+        shards.filter(post_id__in=totals).update(count=0)
+    return len(totals)
+
+
+def get_hot_post_ids(now=None):
+    since = (now or timezone.now()) - timedelta(
+        seconds=settings.LIKES_HOT_WINDOW
+    )
+    return set(
+        Like.objects.filter(created__gte=since).order_by().values(
+            'post_id'
+        ).annotate(count=Count('id')).filter(
+            count__gte=settings.LIKES_HOT_THRESHOLD
+        ).values_list('post_id', flat=True)
+    )
+
+
+def rebalance_shards(now=None):
+    """Делит счётчик записей, которые часто отмечают, на LIKES_SHARDS
+    частей, а остывшим возвращает обычный счётчик; возвращает число
+    записей с разделённым счётчиком."""
+    hot = get_hot_post_ids(now)
+    cooled = set(Post.all_objects.filter(like_shards__gt=0).exclude(
+        pk__in=hot
+    ).values_list('pk', flat=True))
+    with transaction.atomic():
+        Post.all_objects.filter(pk__in=cooled).update(like_shards=0)
+        fold_shards(cooled)
+        LikeShard.objects.filter(post_id__in=cooled).delete()
+    shards = settings.LIKES_SHARDS
+    LikeShard.objects.bulk_create(
+        [LikeShard(post_id=post_id, shard=shard)
+         for post_id in hot for shard in range(shards)],
+        ignore_conflicts=True,
+    )
+    Post.all_objects.filter(pk__in=hot).update(like_shards=shards)
+    return len(hot)
@@ -0,0 +1,50 @@
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.core.signals import setting_changed
+from django.urls import get_script_prefix, reverse
+from django.utils.http import RFC3986_SUBDELIMS
+
+INT_MARKER = 918273645
+STR_MARKER = 'zzlinkmarker{}zz'
+SAFE_CHARS = RFC3986_SUBDELIMS + '/~:@'
+
+
+@lru_cache(maxsize=None)
+def get_url_format(name, params):
+    """Строка формата пути для name без префикса скрипта.
+
+    Путь получается одним reverse() с метками вместо параметров, метки
+    затем заменяются полями формата.
+    """
+    markers = {}
+    for index, (param, param_type) in enumerate(params):
+        if param_type is int:
+            markers[param] = INT_MARKER + index
+        else:
+            markers[param] = STR_MARKER.format(index)
+    path = reverse(name, kwargs=markers)[len(get_script_prefix()):]
+    path = path.replace('{', '{{').replace('}', '}}')
+    for param, marker in markers.items():
+        path = path.replace(str(marker), '{%s}' % param)
+    return path
+
+
+def build_url(name, **kwargs):
+    """Быстрая замена reverse(name, kwargs=kwargs) для горячих путей."""
+    params = tuple(
+        (param, int if isinstance(value, int) else str)
+        for param, value in sorted(kwargs.items())
+    )
+    return get_script_prefix() + get_url_format(name, params).format(**{
+        param: quote(str(value), safe=SAFE_CHARS)
+        for param, value in kwargs.items()
+    })
+
+
+def clear_url_formats(*, setting, **kwargs):
+    if setting == 'ROOT_URLCONF':
+        get_url_format.cache_clear()
+
+
+setting_changed.connect(clear_url_formats)
@@ -0,0 +1,198 @@
+"""Long-poll ответ "новые записи после курсора" для ASGI-сервера.
+
+Ожидающие соединения обслуживаются одним циклом событий: общий
+PostNotifier раз в LONGPOLL_INTERVAL секунд узнаёт id последней записи и
+будит всех ожидающих, а запросы к БД выполняются в ограниченном пуле
+потоков yatube.async_utils.
+"""
+import asyncio
+import json
+from http.cookies import SimpleCookie
+from importlib import import_module
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db.models import Max
+
+from yatube.async_utils import run_sync
+
+from .models import Post
+
+FEEDS = ('index', 'follow')
+NEW_POSTS_LIMIT = 100
+
+
+def get_new_posts(cursor, user_id=None):
+    """Записи с id больше cursor; для ленты подписок - только авторов,
+    на которых подписан user_id."""
+    posts = Post.objects.filter(id__gt=cursor)
+    if user_id is not None:
+        posts = posts.filter(author__following__user_id=user_id)
+    ids = list(
+        posts.order_by('-id').values_list('id', flat=True)[:NEW_POSTS_LIMIT]
+    )
+    count = len(ids)
+    if count == NEW_POSTS_LIMIT:
+        count = posts.count()
+    return {'cursor': ids[0] if ids else cursor, 'count': count, 'ids': ids}
+
+
+def parse_cursor(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_latest_post_id():
+    return Post.objects.aggregate(latest=Max('id'))['latest'] or 0
+
+
+def get_session_user_id(session_key):
+    engine = import_module(settings.SESSION_ENGINE)
+    request = SimpleNamespace(session=engine.SessionStore(session_key))
+    user = get_user(request)
+    return user.pk if user.is_authenticated else None
+
+
+class PostNotifier:
+    def __init__(self, interval):
+        self.interval = interval
+        self.loop = None
+
+    def reset(self, loop):
+        self.loop = loop
+        self.latest_id = None
+        self.changed = asyncio.Event()
+        self.waiters = 0
+        self.poller = None
+
+    async def wait(self, cursor, timeout):
+        """Ждёт записи с id больше cursor; возвращает id последней записи
+        или None по истечении timeout."""
+        loop = asyncio.get_event_loop()
+        if self.loop is not loop:
+            self.reset(loop)
+        deadline = loop.time() + timeout
+        self.waiters += 1
+        if self.poller is None or self.poller.done():
+            self.poller = loop.create_task(self.poll())
+        try:
+            while self.latest_id is None or self.latest_id <= cursor:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(self.changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return None
+            return self.latest_id
+        finally:
+            self.waiters -= 1
+
+    async def poll(self):
+        while self.waiters:
+            latest_id = await run_sync(get_latest_post_id)
+            if latest_id != self.latest_id:
+                self.latest_id = latest_id
+                changed, self.changed = self.changed, asyncio.Event()
+                changed.set()
+            await asyncio.sleep(self.interval)
+
+
+notifier = PostNotifier(settings.LONGPOLL_INTERVAL)
+
+
+async def wait_new_posts(cursor, user_id, timeout):
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + timeout
+    seen_id = cursor
+    while True:
+        result = await run_sync(get_new_posts, cursor, user_id)
+        remaining = deadline - loop.time()
+        if result['count'] or remaining <= 0:
+            return result
+        seen_id = await notifier.wait(seen_id, remaining)
+        if seen_id is None:
+            return result
+
+
+def get_session_key(scope):
+    cookies = SimpleCookie()
+    for name, value in scope.get('headers', []):
+        if name == b'cookie':
+            cookies.load(value.decode('latin-1'))
+    morsel = cookies.get(settings.SESSION_COOKIE_NAME)
+    return morsel.value if morsel else None
+
+
+async def send_json(send, status, data):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'cache-control', b'no-store'),
+        ],
+    })
+    await send({
+        'type': 'http.response.body',
+        'body': json.dumps(data).encode(),
+    })
+
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def new_posts_since(scope, receive, send):
+    query = parse_qs(scope.get('query_string', b'').decode())
+    feed = query.get('feed', ['index'])[0]
+    if feed not in FEEDS:
+        await send_json(send, 400, {'error': 'unknown feed'})
+        return
+    cursor = parse_cursor(query.get('cursor', [None])[0])
+    timeout = min(
+        parse_cursor(query.get('timeout', [settings.LONGPOLL_TIMEOUT])[0]),
+        settings.LONGPOLL_TIMEOUT,
+    )
+    user_id = None
+    if feed == 'follow':
+        session_key = get_session_key(scope)
+        if session_key:
+            user_id = await run_sync(get_session_user_id, session_key)
+        if user_id is None:
+            await send_json(send, 403, {'error': 'login required'})
+            return
+    waiting = asyncio.ensure_future(wait_new_posts(cursor, user_id, timeout))
+    disconnect = asyncio.ensure_future(wait_disconnect(receive))
+    await asyncio.wait(
+        (waiting, disconnect), return_when=asyncio.FIRST_COMPLETED
+    )
+    disconnect.cancel()
+    if not waiting.done():
+        waiting.cancel()
+        return
+    await send_json(send, 200, waiting.result())
+
+
+async def lifespan(scope, receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(scope, receive, send)
+    elif scope['path'] == settings.LONGPOLL_PATH:
+        await new_posts_since(scope, receive, send)
+    else:
+        await send_json(send, 404, {'error': 'not found'})
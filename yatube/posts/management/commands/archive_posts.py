@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_posts
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые записи с комментариями в архивные таблицы'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        moved = archive_posts(batch_size=options['batch_size'])
+        self.stdout.write(f'Перенесено в архив записей: {moved}')
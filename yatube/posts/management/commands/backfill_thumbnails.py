@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.tasks import make_post_thumbnail
+from tasks.queue import enqueue
+
+
+class Command(BaseCommand):
+    help = 'Ставит в очередь миниатюры записей, у которых их ещё нет'
+
+    def handle(self, *args, **options):
+        posts = Post.all_objects.exclude(image='').exclude(
+            image__isnull=True
+        ).filter(thumbnail='').values_list('pk', flat=True)
+        count = 0
+        for post_id in posts.iterator():
+            enqueue(make_post_thumbnail, post_id)
+            count += 1
+        self.stdout.write(f'Поставлено в очередь миниатюр: {count}')
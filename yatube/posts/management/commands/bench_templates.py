@@ -0,0 +1,68 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Group, Post
+from posts.views import prepare_cards
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Замеряет отрисовку index.html с 10/50/100 записями; '
+            'тестовые данные удаляются откатом транзакции')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[10, 50, 100]
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def create_posts(self, count):
+        author = User.objects.create_user(username='bench_templates')
+        group = Group.objects.create(
+            title='Тестовая группа', slug='bench-templates', description='-'
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Запись {i} ' * 30, author=author, group=group)
+            for i in range(count)
+        )
+        return author
+
+    def get_page(self, request, size):
+        page = Paginator(Post.objects.for_feed(), size).get_page(1)
+        prepare_cards(page.object_list, request.user)
+        return {'page': page}
+
+    def measure(self, request, size, repeat):
+        render_to_string('index.html', self.get_page(request, size), request)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                render_to_string(
+                    'index.html', self.get_page(request, size), request
+                )
+            elapsed = (time.perf_counter() - started) / repeat
+        return elapsed, len(queries) // repeat
+
+    def handle(self, *args, **options):
+        sizes = options['sizes']
+        with transaction.atomic():
+            request = RequestFactory().get('/')
+            request.user = self.create_posts(max(sizes))
+            for size in sizes:
+                elapsed, queries = self.measure(
+                    request, size, options['repeat']
+                )
+                self.stdout.write(
+                    f'{size:4} записей: {elapsed * 1000:7.2f} мс/страница, '
+                    f'{elapsed * 1000000 / size:6.0f} мкс/карточка, '
+                    f'запросов: {queries}'
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,37 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from posts.links import build_url
+
+
+def card_reverse():
+    reverse('profile', args=['author'])
+    reverse('group_detail', args=['group'])
+    reverse('post', args=['author', 123])
+    reverse('post_edit', args=['author', 123])
+
+
+def card_build_url():
+    build_url('profile', username='author')
+    build_url('group_detail', slug='group')
+    build_url('post', username='author', post_id=123)
+    build_url('post_edit', username='author', post_id=123)
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает reverse() и build_url() для ссылок одной карточки'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        number = options['number']
+        for name, func in (('reverse', card_reverse),
+                           ('build_url', card_build_url)):
+            func()
+            elapsed = timeit.timeit(func, number=number)
+            self.stdout.write(
+                f'{name:10} {elapsed * 1000000 / number:6.1f} мкс/карточка'
+            )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import build_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации авторов по графу подписок'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        users = build_recommendations(
+            options['limit'], options['batch_size']
+        )
+        self.stdout.write(f'Обновлены рекомендации пользователей: {users}')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts.sitemaps import build_sitemaps
+
+
+class Command(BaseCommand):
+    help = ('Обновляет карту сайта: последние файлы разделов и индекс, '
+            'с --full - все файлы')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true')
+
+    def handle(self, *args, **options):
+        written = build_sitemaps(full=options['full'])
+        self.stdout.write(f'Записано файлов карты: {len(written)}')
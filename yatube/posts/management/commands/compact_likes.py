@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts.likes import fold_shards, rebalance_shards
+
+
+class Command(BaseCommand):
+    help = ('Сворачивает части счётчиков отметок в Post.likes_count и '
+            'заново выбирает записи, которым нужен счётчик по частям')
+
+    def handle(self, *args, **options):
+        folded = fold_shards()
+        hot = rebalance_shards()
+        self.stdout.write(
+            f'Свёрнуто счётчиков: {folded}, популярных записей: {hot}'
+        )
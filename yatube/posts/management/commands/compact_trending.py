@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import compact
+
+
+class Command(BaseCommand):
+    help = 'Переносит точку отсчёта рейтингов популярности на текущее время'
+
+    def handle(self, *args, **options):
+        compact()
+        self.stdout.write('Рейтинги популярности пересчитаны')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import flush_views
+
+
+class Command(BaseCommand):
+    help = 'Переносит накопленные в кэше просмотры записей в базу'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=300)
+
+    def handle(self, *args, **options):
+        updated = flush_views(batch_size=options['batch_size'])
+        self.stdout.write(f'Обновлено записей: {updated}')
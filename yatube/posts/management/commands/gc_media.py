@@ -0,0 +1,111 @@
+import os
+import shutil
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+from posts.models import ArchivedPost, Post
+from posts.thumbnails import load_variants
+
+UPLOAD_DIR = 'posts'
+
+
+def iter_files(root):
+    """Обходит каталог через os.scandir без построения списка файлов."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+def get_referenced_names(batch_size=10000):
+    """Имена файлов (относительно MEDIA_ROOT), на которые ссылаются записи
+    и архив: изображения, миниатюры и их варианты."""
+    names = set()
+    for model in (Post.all_objects, ArchivedPost.objects):
+        rows = model.exclude(image='').values_list(
+            'image', 'thumbnail', 'thumbnail_variants'
+        )
+        for image, thumbnail, variants in rows.iterator(batch_size):
+            names.add(image)
+            names.add(thumbnail)
+            for variant in load_variants(variants):
+                names.add(variant.get('jpeg'))
+                names.add(variant.get('webp'))
+    names.discard('')
+    names.discard(None)
+    return names
+
+
+class Command(BaseCommand):
+    help = ('Удаляет или переносит в карантин файлы загрузок и миниатюр, '
+            'на которые не ссылается ни одна запись')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument(
+            '--quarantine', help='Каталог, куда переносить файлы-сироты'
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=24 * 60 * 60,
+            help='Не трогать файлы моложе этого срока (секунды)',
+        )
+        parser.add_argument('--progress', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        media_root = os.path.abspath(settings.MEDIA_ROOT)
+        referenced = get_referenced_names()
+        thumbnail_dir = thumbnail_settings.THUMBNAIL_PREFIX.strip('/')
+        cutoff = time.time() - options['min_age']
+        scanned = orphans = freed = 0
+        for directory in (UPLOAD_DIR, thumbnail_dir):
+            root = os.path.join(media_root, directory)
+            if not os.path.isdir(root):
+                continue
+            for entry in iter_files(root):
+                scanned += 1
+                if scanned % options['progress'] == 0:
+                    self.stdout.write(
+                        f'Просмотрено: {scanned}, сирот: {orphans}'
+                    )
+                name = os.path.relpath(entry.path, media_root).replace(
+                    os.sep, '/'
+                )
+                if name in referenced:
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_mtime > cutoff:
+                    continue
+                orphans += 1
+                freed += stat.st_size
+                if options['dry_run']:
+                    self.stdout.write(f'Сирота: {name}')
+                    continue
+                self.remove(entry.path, name, options['quarantine'])
+                if directory == thumbnail_dir:
+                    # Иначе sorl продолжит отдавать ссылку на удалённый файл
+                    default.kvstore.delete(
+                        ImageFile(name, default.storage),
+                        delete_thumbnails=False,
+                    )
+        action = 'Найдено' if options['dry_run'] else 'Убрано'
+        self.stdout.write(
+            f'Просмотрено файлов: {scanned}. {action} сирот: {orphans} '
+            f'({freed // 1024} КБ)'
+        )
+
+    def remove(self, path, name, quarantine):
+        if quarantine is None:
+            os.remove(path)
+            return
+        target = os.path.join(quarantine, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(path, target)
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+async def fetch(host, port, target):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        f'GET {target} HTTP/1.1\r\nHost: {host}\r\n'
+        f'Connection: close\r\n\r\n'.encode()
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    while await reader.read(65536):
+        pass
+    writer.close()
+    return int(status_line.split()[1])
+
+
+def percentile(values, share):
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест: параллельные GET-запросы к запущенному '
+            'серверу (WSGI или ASGI)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=100)
+
+    async def run(self, url, total, concurrency):
+        parts = urlsplit(url)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        latencies = []
+        errors = 0
+        remaining = total
+
+        async def client():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    status = await fetch(
+                        parts.hostname, parts.port or 80, target
+                    )
+                except OSError:
+                    status = None
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return time.perf_counter() - started, sorted(latencies), errors
+
+    def handle(self, *args, **options):
+        elapsed, latencies, errors = asyncio.run(self.run(
+            options['url'], options['requests'], options['concurrency']
+        ))
+        self.stdout.write(
+            f'запросов: {len(latencies)}, ошибок: {errors}, '
+            f'{len(latencies) / elapsed:.1f} запр/с'
+        )
+        self.stdout.write('задержка, мс: ' + ', '.join(
+            f'p{int(share * 100)}={percentile(latencies, share) * 1000:.0f}'
+            for share in (0.5, 0.95, 0.99)
+        ))
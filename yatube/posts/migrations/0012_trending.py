@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-19 02:47
+
+import time
+
+from django.db import migrations, models
+
+
+def create_epoch(apps, schema_editor):
+    TrendingEpoch = apps.get_model('posts', 'TrendingEpoch')
+    TrendingEpoch.objects.create(pk=1, timestamp=time.time())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_recommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingEpoch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.FloatField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='trending_score',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='trending_score',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.RunPython(create_epoch, migrations.RunPython.noop),
+    ]
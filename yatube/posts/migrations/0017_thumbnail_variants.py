@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-19 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_post_thumbnail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='thumbnail_variants',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail_variants',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -1,21 +1,54 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .links import build_url
+from .thumbnails import attach_thumbnails
+
 User = get_user_model()
 
+THUMBNAIL_FIELDS = (
+    'thumbnail', 'thumbnail_width', 'thumbnail_height', 'thumbnail_variants'
+)
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=50, unique=True)
     description = models.TextField()
+    trending_score = models.FloatField(default=0, db_index=True)
 
     def __str__(self):
         return self.title
 
+    def get_absolute_url(self):
+        return build_url('group_detail', slug=self.slug)
+
+
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Записи для лент: автор и группа - через JOIN. Счётчики и
+        миниатюры страницы добавляет attach_card_data после выборки, поэтому
+        count() для пагинатора остаётся простым COUNT(*)."""
+        return self.select_related('author', 'group')
+
+
+class PostManager(models.Manager.from_queryset(PostQuerySet)):
+    """Менеджер по умолчанию: удалённые записи не видны нигде на сайте."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+class CommentManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
 
 class Post(models.Model):
     text = models.TextField()
-    pub_date = models.DateTimeField("date published", auto_now_add=True)
+    pub_date = models.DateTimeField(
+        "date published", auto_now_add=True, db_index=True
+    )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="posts"
     )
@@ -24,6 +57,23 @@ class Post(models.Model):
         blank=True, null=True
     )
     image = models.ImageField(upload_to="posts/", blank=True, null=True)
+    thumbnail = models.CharField(max_length=255, blank=True)
+    thumbnail_width = models.PositiveIntegerField(null=True, blank=True)
+    thumbnail_height = models.PositiveIntegerField(null=True, blank=True)
+    thumbnail_variants = models.TextField(blank=True)
+    views_count = models.PositiveIntegerField(default=0)
+    likes_count = models.PositiveIntegerField(default=0)
+    # Число строк LikeShard, по которым раскладываются отметки популярной
+    # записи; 0 - счётчик ведётся в самой строке записи
+    like_shards = models.PositiveSmallIntegerField(default=0)
+    trending_score = models.FloatField(default=0, db_index=True)
+    is_deleted = models.BooleanField(default=False)
+    version = models.PositiveIntegerField(default=1)
+
+    objects = PostManager()
+    all_objects = PostQuerySet.as_manager()
+
+    is_archived = False
 
     class Meta:
         ordering = ["-pub_date"]
@@ -31,6 +81,49 @@ class Post(models.Model):
     def __str__(self):
         return self.text[:15]
 
+    def get_absolute_url(self):
+        return build_url(
+            'post', username=self.author.username, post_id=self.pk
+        )
+
+    def get_edit_url(self):
+        return build_url(
+            'post_edit', username=self.author.username, post_id=self.pk
+        )
+
+    def get_like_url(self):
+        return build_url(
+            'post_like', username=self.author.username, post_id=self.pk
+        )
+
+    def get_author_url(self):
+        return build_url('profile', username=self.author.username)
+
+    def soft_delete(self):
+        self.is_deleted = True
+        self.save(update_fields=['is_deleted'])
+
+    def save_changes(self, fields, version):
+        """Записывает только поля fields и увеличивает версию, если запись
+        в базе всё ещё имеет версию version. False - если её успели
+        изменить в другом месте."""
+        if 'image' in fields:
+            self.thumbnail = self.thumbnail_variants = ''
+            self.thumbnail_width = self.thumbnail_height = None
+            fields = [*fields, *THUMBNAIL_FIELDS]
+        values = {
+            name: self._meta.get_field(name).pre_save(self, False)
+            for name in fields
+        }
+        updated = Post.all_objects.filter(
+            pk=self.pk, version=version
+        ).update(
+            version=models.F('version') + 1, **values
+        )
+        if updated:
+            self.version = version + 1
+        return bool(updated)
+
 
 class Comment(models.Model):
     text = models.TextField()
@@ -40,6 +133,66 @@ class Comment(models.Model):
     )
     post = models.ForeignKey(
         Post, on_delete=models.CASCADE, related_name="comments")
+    is_deleted = models.BooleanField(default=False)
+
+    objects = CommentManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ["-created"]
+
+    def soft_delete(self):
+        self.is_deleted = True
+        self.save(update_fields=['is_deleted'])
+
+
+class ArchivedPost(models.Model):
+    """Запись старше ARCHIVE_AFTER; id совпадает с исходным, поэтому
+    ссылки на запись продолжают работать."""
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField()
+    pub_date = models.DateTimeField("date published", db_index=True)
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_posts"
+    )
+    group = models.ForeignKey(
+        Group, on_delete=models.SET_NULL, related_name="archived_posts",
+        blank=True, null=True
+    )
+    image = models.ImageField(upload_to="posts/", blank=True, null=True)
+    thumbnail = models.CharField(max_length=255, blank=True)
+    thumbnail_width = models.PositiveIntegerField(null=True, blank=True)
+    thumbnail_height = models.PositiveIntegerField(null=True, blank=True)
+    thumbnail_variants = models.TextField(blank=True)
+    views_count = models.PositiveIntegerField(default=0)
+    likes_count = models.PositiveIntegerField(default=0)
+
+    is_archived = True
+
+    class Meta:
+        ordering = ["-pub_date"]
+
+    def __str__(self):
+        return self.text[:15]
+
+    def get_absolute_url(self):
+        return build_url(
+            'post', username=self.author.username, post_id=self.pk
+        )
+
+    def get_author_url(self):
+        return build_url('profile', username=self.author.username)
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField()
+    created = models.DateTimeField("date")
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_comments"
+    )
+    post = models.ForeignKey(
+        ArchivedPost, on_delete=models.CASCADE, related_name="comments")
 
     class Meta:
         ordering = ["-created"]
@@ -52,3 +205,84 @@ class Follow(models.Model):
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="follower"
     )
+
+
+class Like(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="likes"
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="likes"
+    )
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"], name="unique_like"
+            ),
+        ]
+
+
+class LikeShard(models.Model):
+    """Часть счётчика отметок популярной записи: параллельные отметки
+    обновляют разные строки и не ждут блокировку строки Post."""
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="like_shard_set"
+    )
+    shard = models.PositiveSmallIntegerField()
+    # Может быть отрицательной: отметку снимают в случайной части
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "shard"], name="unique_like_shard"
+            ),
+        ]
+
+
+class TrendingEpoch(models.Model):
+    """Точка отсчёта (Unix-время), относительно которой хранятся
+    рейтинги популярности."""
+    timestamp = models.FloatField()
+
+
+class Recommendation(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="recommendations"
+    )
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="recommended_to"
+    )
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ["-score"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "author"], name="unique_recommendation"
+            ),
+        ]
+
+
+def attach_card_data(posts):
+    """Данные карточек для всей страницы: число комментариев одним
+    запросом на таблицу (основную и архивную) и миниатюры из строки
+    записи или одним get_many из кэша, а не по запросу на карточку."""
+    posts = list(posts)
+    attach_comment_counts([post for post in posts if not post.is_archived])
+    attach_comment_counts(
+        [post for post in posts if post.is_archived], ArchivedComment
+    )
+    attach_thumbnails(posts)
+
+
+def attach_comment_counts(posts, model=Comment):
+    counts = dict(
+        model.objects.filter(post__in=posts).order_by().values(
+            'post_id'
+        ).annotate(count=models.Count('id')).values_list('post_id', 'count')
+    )
+    for post in posts:
+        post.comment_count = counts.get(post.id, 0)
@@ -0,0 +1,148 @@
+"""Рекомендации авторов по графу подписок.
+
+Граф подписок загружается в память в виде массивов смежности (CSR):
+authors[offsets[i]:offsets[i + 1]] - авторы, на которых подписан
+пользователь users[i]. Рекомендации строятся пакетно командой
+build_recommendations и хранятся в таблице Recommendation.
+"""
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Follow, Post, Recommendation
+
+GROUP_AUTHOR_WEIGHT = 0.5
+
+
+class FollowGraph:
+    def __init__(self, edges):
+        """edges - пары (user_id, author_id), упорядоченные по user_id."""
+        self.users = array('q')
+        self.offsets = array('q', [0])
+        self.authors = array('q')
+        for user_id, author_id in edges:
+            if not self.users or self.users[-1] != user_id:
+                if self.users:
+                    self.offsets.append(len(self.authors))
+                self.users.append(user_id)
+            self.authors.append(author_id)
+        if self.users:
+            self.offsets.append(len(self.authors))
+
+    @classmethod
+    def load(cls):
+        edges = Follow.objects.order_by('user_id', 'author_id').values_list(
+            'user_id', 'author_id'
+        )
+        return cls(edges.iterator(chunk_size=10000))
+
+    def following(self, user_id):
+        index = bisect_left(self.users, user_id)
+        if index == len(self.users) or self.users[index] != user_id:
+            return self.authors[0:0]
+        return self.authors[self.offsets[index]:self.offsets[index + 1]]
+
+    def followers_count(self):
+        return Counter(self.authors)
+
+
+def load_group_authors(popularity, limit):
+    """Самые популярные авторы каждой группы и группы каждого автора."""
+    group_authors = defaultdict(set)
+    author_groups = defaultdict(set)
+    pairs = Post.objects.filter(group__isnull=False).order_by().values_list(
+        'group_id', 'author_id'
+    ).distinct()
+    for group_id, author_id in pairs.iterator(chunk_size=10000):
+        group_authors[group_id].add(author_id)
+        author_groups[author_id].add(group_id)
+    top_authors = {
+        group_id: sorted(authors, key=lambda a: -popularity[a])[:limit]
+        for group_id, authors in group_authors.items()
+    }
+    return top_authors, author_groups
+
+
+def recommend(user_id, graph, popularity, group_authors, author_groups,
+              limit):
+    """Авторы второго круга подписок (вес - число общих связей) плюс
+    популярные авторы групп, которые читает пользователь."""
+    following = set(graph.following(user_id))
+    scores = Counter()
+    groups = Counter()
+    for author_id in following:
+        for candidate in graph.following(author_id):
+            scores[candidate] += 1
+        groups.update(author_groups.get(author_id, ()))
+    for group_id, weight in groups.items():
+        for candidate in group_authors.get(group_id, ()):
+            scores[candidate] += GROUP_AUTHOR_WEIGHT * weight
+    for author_id in following | {user_id}:
+        scores.pop(author_id, None)
+    return sorted(
+        scores.items(), key=lambda item: (-item[1], -popularity[item[0]])
+    )[:limit]
+
+
+def build_recommendations(limit=None, batch_size=1000):
+    limit = limit or settings.RECOMMENDATIONS_LIMIT
+    graph = FollowGraph.load()
+    popularity = graph.followers_count()
+    group_authors, author_groups = load_group_authors(popularity, limit)
+    users = list(graph.users)
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+        rows = [
+            Recommendation(user_id=user_id, author_id=author_id, score=score)
+            for user_id in batch
+            for author_id, score in recommend(
+                user_id, graph, popularity, group_authors, author_groups,
+                limit
+            )
+        ]
+        with transaction.atomic():
+            Recommendation.objects.filter(user_id__in=batch).delete()
+            Recommendation.objects.bulk_create(rows)
+    stale = Recommendation.objects.filter(
+        user__follower__isnull=True
+    ).values_list('user_id', flat=True).distinct()
+    popular = get_popular_authors(limit + 1)
+    for user_id in list(stale):
+        save_popular_authors(user_id, popular)
+    return len(users)
+
+
+def get_popular_authors(limit):
+    return list(
+        Follow.objects.order_by().values('author_id').annotate(
+            followers=Count('pk')
+        ).order_by('-followers', 'author_id').values_list(
+            'author_id', 'followers'
+        )[:limit]
+    )
+
+
+def save_popular_authors(user_id, popular=None):
+    """Рекомендации для пользователя без подписок - самые читаемые авторы."""
+    limit = settings.RECOMMENDATIONS_LIMIT
+    if popular is None:
+        popular = get_popular_authors(limit + 1)
+    rows = [
+        Recommendation(user_id=user_id, author_id=author_id, score=score)
+        for author_id, score in popular if author_id != user_id
+    ][:limit]
+    with transaction.atomic():
+        Recommendation.objects.filter(user_id=user_id).delete()
+        Recommendation.objects.bulk_create(rows)
+
+
+def get_recommendations(user):
+    if not user.is_authenticated:
+        return []
+    return Recommendation.objects.filter(user=user).select_related(
+        'author'
+    )[:settings.RECOMMENDATIONS_LIMIT]
@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from tasks.queue import enqueue_on_commit, enqueue_once_on_commit
+
+from .authors import get_card_key, invalidate_author_cards
+from .feeds import bump_generation_on_commit as invalidate_feeds
+from .models import Comment, Follow, Post, User
+from .tasks import make_post_thumbnail, update_sitemaps
+from .trending import bump
+
+# Отправляется после успешного редактирования записи; changed - имена
+# изменённых полей, чтобы получатели сбрасывали только то, что устарело.
+post_edited = Signal()
+# Отправляется после массового изменения записей в обход post_save
+# (действия админки, архив): post_ids и author_ids затронутых записей.
+posts_changed = Signal()
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    invalidate_author_cards(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+    latest = Post.objects.filter(author_id=instance.author_id).values(
+        'pk', 'group_id'
+    ).first()
+    if latest is not None:
+        bump(
+            latest['pk'], latest['group_id'], settings.TRENDING_FOLLOW_WEIGHT
+        )
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        bump(
+            instance.post_id, instance.post.group_id,
+            settings.TRENDING_COMMENT_WEIGHT
+        )
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, update_fields=None, **kwargs):
+    if created or 'is_deleted' in (update_fields or ()):
+        invalidate_author_cards(instance.author_id)
+        invalidate_feeds()
+    if created:
+        # Одна пересборка на серию записей: пока задача ждёт в очереди,
+        # вторая не ставится
+        enqueue_once_on_commit(
+            update_sitemaps, delay=settings.SITEMAP_UPDATE_DELAY
+        )
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    """Удаление и перенос записи в архив."""
+    invalidate_author_cards(instance.author_id)
+    invalidate_feeds()
+
+
+@receiver(posts_changed, sender=Post)
+def posts_changed_in_bulk(sender, post_ids, author_ids, **kwargs):
+    invalidate_author_cards(*author_ids)
+    invalidate_feeds()
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    cache.delete(get_card_key(instance.username))
+
+
+@receiver(pre_save, sender=User)
+def user_renamed(sender, instance, update_fields=None, **kwargs):
+    """Карточка хранится под именем пользователя: при переименовании
+    сбрасывается и ключ старого имени."""
+    if instance.pk is None or (
+            update_fields is not None and 'username' not in update_fields):
+        return
+    old = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True
+    ).first()
+    if old and old != instance.username:
+        cache.delete(get_card_key(old))
+
+
+@receiver(post_edited, sender=Post)
+def post_text_changed(sender, instance, changed, **kwargs):
+    if 'text' in changed or 'group' in changed:
+        invalidate_feeds()
+
+
+@receiver(post_edited, sender=Post)
+def post_image_changed(sender, instance, changed, **kwargs):
+    if 'image' in changed and instance.image:
+        enqueue_on_commit(make_post_thumbnail, instance.pk)
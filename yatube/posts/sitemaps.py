@@ -0,0 +1,226 @@
+"""Карта сайта: индекс и файлы по диапазонам id.
+
+Записи и авторы разбиты на файлы по SITEMAP_CHUNK_SIZE идентификаторов,
+сообщества - один файл. Файлы пишутся в MEDIA_ROOT/SITEMAP_DIR и
+отдаются как статические. При пересборке переписываются последний файл
+каждого раздела, индекс и только те заполненные файлы, что устарели:
+файлы записей, где число видимых записей разошлось с записанным (запись
+скрыли, удалили или вернули), и файлы авторов, писавших после прошлой
+сборки. lastmod и число строк готовых файлов и id последней учтённой
+записи хранятся в manifest.json. Полная пересборка - build_sitemaps
+--full.
+"""
+import json
+import os
+import threading
+from collections import Counter
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Max
+
+from .links import build_url
+from .models import ArchivedPost, Group, Post
+
+User = get_user_model()
+
+MANIFEST = 'manifest.json'
+INDEX = 'sitemap.xml'
+
+
+def get_sitemap_root():
+    return os.path.join(settings.MEDIA_ROOT, settings.SITEMAP_DIR)
+
+
+class PostsSection:
+    name = 'posts'
+    chunked = True
+
+    def max_id(self):
+        return max(
+            get_last_post_id(),
+            ArchivedPost.objects.aggregate(max_id=Max('id'))['max_id'] or 0,
+        )
+
+    def stale_chunks(self, size, last, manifest):
+        """Заполненные файлы, где число видимых записей разошлось с
+        записанным."""
+        counts = Counter()
+        for model in (Post.objects, ArchivedPost.objects):
+            counts.update(dict(
+                model.order_by().annotate(chunk=F('id') / size).values(
+                    'chunk'
+                ).annotate(rows=Count('id')).values_list('chunk', 'rows')
+            ))
+        written = manifest['counts']
+        return {
+            chunk for chunk in range(last)
+            if counts[chunk] != written.get(f'sitemap-posts-{chunk}.xml')
+        }
+
+    def rows(self, start, stop):
+        for model in (Post.objects, ArchivedPost.objects):
+            posts = model.filter(id__gte=start, id__lt=stop).order_by(
+                'id'
+            ).values_list('id', 'author__username', 'pub_date')
+            for post_id, username, pub_date in posts.iterator():
+                yield (
+                    build_url('post', username=username, post_id=post_id),
+                    pub_date,
+                )
+
+
+class AuthorsSection:
+    name = 'authors'
+    chunked = True
+
+    def max_id(self):
+        return User.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+
+    def stale_chunks(self, size, last, manifest):
+        """Файлы авторов, у которых после прошлой сборки появились записи
+        и, значит, сменился lastmod."""
+        authors = Post.objects.filter(
+            id__gt=manifest['last_post_id']
+        ).order_by().values_list('author_id', flat=True).distinct()
+        return {author_id // size for author_id in authors}
+
+    def rows(self, start, stop):
+        lastmods = get_lastmods(
+            'author_id', author_id__gte=start, author_id__lt=stop
+        )
+        authors = User.objects.filter(pk__in=lastmods).order_by(
+            'id'
+        ).values_list('id', 'username')
+        for author_id, username in authors.iterator():
+            yield (
+                build_url('profile', username=username), lastmods[author_id]
+            )
+
+
+class GroupsSection:
+    name = 'groups'
+    chunked = False
+
+    def rows(self, start, stop):
+        lastmods = get_lastmods('group_id')
+        groups = Group.objects.order_by('id').values_list('id', 'slug')
+        for group_id, slug in groups.iterator():
+            yield build_url('group_detail', slug=slug), lastmods.get(group_id)
+
+
+SECTIONS = (PostsSection(), AuthorsSection(), GroupsSection())
+
+
+def get_lastmods(field, **filters):
+    """{значение field: дата последней записи} по видимым записям и
+    архиву. Не через Max('posts__pub_date'): соединение по обратной связи
+    не видит архив и учитывает скрытые записи."""
+    lastmods = {}
+    for model in (Post.objects, ArchivedPost.objects):
+        rows = model.filter(**filters).order_by().values(field).annotate(
+            lastmod=Max('pub_date')
+        ).values_list(field, 'lastmod')
+        for key, lastmod in rows:
+            if key is not None:
+                lastmods[key] = max(lastmods.get(key, lastmod), lastmod)
+    return lastmods
+
+
+def get_last_post_id():
+    return Post.all_objects.aggregate(max_id=Max('id'))['max_id'] or 0
+
+
+def write_atomic(path, chunks):
+    # Временное имя своё у каждого процесса и потока: две задачи
+    # пересборки могут писать один файл одновременно
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        file.writelines(chunks)
+    os.replace(temp_path, path)
+
+
+def write_urlset(path, rows):
+    """Пишет файл карты; возвращает наибольший lastmod (или None) и число
+    строк."""
+    latest = []
+    count = [0]
+
+    def lines():
+        yield ('<?xml version="1.0" encoding="UTF-8"?>\n<urlset '
+               'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for url, lastmod in rows:
+            line = f'<url><loc>{escape(settings.SITE_URL + url)}</loc>'
+            if lastmod is not None:
+                line += f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+                latest[:] = [max(latest + [lastmod])]
+            count[0] += 1
+            yield line + '</url>\n'
+        yield '</urlset>\n'
+
+    write_atomic(path, lines())
+    return (latest[0] if latest else None), count[0]
+
+
+def write_index(root, manifest):
+    def lines():
+        yield ('<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex '
+               'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for name, lastmod in manifest.items():
+            if lastmod is None:
+                continue
+            yield (f'<sitemap><loc>{escape(settings.SITE_URL)}/{name}</loc>'
+                   f'<lastmod>{lastmod}</lastmod></sitemap>\n')
+        yield '</sitemapindex>\n'
+
+    write_atomic(os.path.join(root, INDEX), lines())
+
+
+def empty_manifest():
+    return {'files': {}, 'counts': {}, 'last_post_id': 0}
+
+
+def load_manifest(root):
+    """Манифест прошлой сборки; нечитаемый или старого формата -
+    пустой, то есть полная пересборка."""
+    try:
+        with open(os.path.join(root, MANIFEST), encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return empty_manifest()
+    if not isinstance(manifest, dict) or set(manifest) != set(
+            empty_manifest()):
+        return empty_manifest()
+    return manifest
+
+
+def build_sitemaps(full=False):
+    """Пересобирает последние файлы разделов (или все при full) и индекс;
+    возвращает имена записанных файлов."""
+    root = get_sitemap_root()
+    os.makedirs(root, exist_ok=True)
+    manifest = empty_manifest() if full else load_manifest(root)
+    files, counts = manifest['files'], manifest['counts']
+    # Записи, созданные во время сборки, учтёт следующая
+    last_post_id = get_last_post_id()
+    size = settings.SITEMAP_CHUNK_SIZE
+    written = []
+    for section in SECTIONS:
+        last = section.max_id() // size if section.chunked else 0
+        stale = section.stale_chunks(size, last, manifest) if last else set()
+        for chunk in range(last + 1):
+            name = f'sitemap-{section.name}-{chunk}.xml'
+            path = os.path.join(root, name)
+            if (chunk < last and chunk not in stale and name in files
+                    and os.path.exists(path)):
+                continue
+            lastmod, counts[name] = write_urlset(
+                path, section.rows(chunk * size, (chunk + 1) * size)
+            )
+            files[name] = lastmod and lastmod.date().isoformat()
+            written.append(name)
+    manifest['last_post_id'] = last_post_id
+    write_atomic(os.path.join(root, MANIFEST), [json.dumps(manifest)])
+    write_index(root, files)
+    return written
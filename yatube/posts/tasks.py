@@ -0,0 +1,45 @@
+import json
+
+from sorl.thumbnail import get_thumbnail
+
+from tasks.queue import task
+
+from .models import Post
+from .recommendations import save_popular_authors
+from .sitemaps import build_sitemaps
+from .thumbnails import (
+    POST_THUMBNAIL, POST_THUMBNAIL_OPTIONS, make_variants, remember_thumbnail
+)
+
+
+@task
+def make_post_thumbnail(post_id):
+    """Строит миниатюру и её варианты для srcset и сохраняет пути и
+    размеры в записи, если изображение с тех пор не заменили."""
+    post = Post.all_objects.filter(pk=post_id).only('image').first()
+    if post is None or not post.image:
+        return
+    thumbnail = get_thumbnail(
+        post.image, POST_THUMBNAIL, **POST_THUMBNAIL_OPTIONS
+    )
+    variants = json.dumps(make_variants(post.image))
+    remember_thumbnail(post.image.name, thumbnail, variants)
+    Post.all_objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnail=thumbnail.name,
+        thumbnail_width=thumbnail.width,
+        thumbnail_height=thumbnail.height,
+        thumbnail_variants=variants,
+    )
+
+
+@task
+def recommend_popular_authors(user_id):
+    """Первые рекомендации нового пользователя, пока у него нет подписок."""
+    save_popular_authors(user_id)
+
+
+@task
+def update_sitemaps():
+    """Дописывает новые записи в карту сайта и переписывает устаревшие
+    файлы."""
+    build_sitemaps()
@@ -0,0 +1,59 @@
+from django import template
+
+from posts.likes import attach_likes
+from posts.links import build_url
+from posts.thumbnails import attach_thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def link(name, **kwargs):
+    """{% link 'profile' username=author.username %} - как {% url %}, но
+    через заранее построенную строку формата."""
+    return build_url(name, **kwargs)
+
+
+@register.inclusion_tag('includes/post_item.html', takes_context=True)
+def post_card(context, post, eager=False):
+    """Карточка записи: ссылки и счётчики вычисляются здесь, а не тегами
+    {% url %} и запросами в шаблоне для каждой карточки."""
+    username = post.author.username
+    user = context.get('user')
+    comment_count = getattr(post, 'comment_count', None)
+    if comment_count is None:
+        comment_count = post.comments.count()
+    is_author = (
+        user is not None and user.username == username
+        and not post.is_archived
+    )
+    if not hasattr(post, 'card_image'):
+        attach_thumbnails([post])
+    if not post.is_archived and not hasattr(post, 'liked'):
+        attach_likes([post], user)
+    can_like = (
+        user is not None and user.is_authenticated and not post.is_archived
+    )
+    request = context.get('request')
+    return {
+        'post': post,
+        'card_image': post.card_image,
+        'eager': eager,
+        'username': username,
+        'comment_count': comment_count,
+        'profile_url': post.get_author_url(),
+        'group_url': post.group.get_absolute_url() if post.group_id else '',
+        'post_url': post.get_absolute_url(),
+        'edit_url': post.get_edit_url() if is_author else '',
+        'like_url': post.get_like_url() if can_like else '',
+        'liked': getattr(post, 'liked', False),
+        'csrf_token': context.get('csrf_token'),
+        'next_url': request.get_full_path() if request else '',
+    }
+
+
+@register.inclusion_tag('includes/picture.html')
+def card_picture(image, eager=False):
+    """<picture> с WebP/JPEG srcset, sizes и явными размерами; изображения
+    ниже первого экрана загружаются лениво."""
+    return {'image': image, 'eager': eager}
@@ -0,0 +1,124 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.feeds import get_generation
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class AdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.posts = [
+            Post.objects.create(
+                text=f'Запись {number}', author=cls.author, group=cls.group
+            )
+            for number in range(5)
+        ]
+        for post in cls.posts:
+            Comment.objects.create(text='!', author=cls.author, post=post)
+            Follow.objects.create(user=cls.admin, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        # TestCase не фиксирует транзакцию: смена поколения, отложенная
+        # при создании данных, не выполнится и не должна блокировать новую
+        connection.feeds_bump_pending = None
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def changelist_queries(self, model):
+        url = reverse(f'admin:posts_{model}_changelist')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_changelists_do_not_query_per_row(self):
+        for model in ('post', 'comment', 'follow'):
+            with self.subTest(model=model):
+                before = self.changelist_queries(model)
+                Post.objects.create(text='Ещё', author=self.author)
+                post = Post.objects.create(text='Ещё', author=self.admin)
+                Comment.objects.create(text='!', author=self.admin, post=post)
+                Follow.objects.create(user=self.author, author=self.admin)
+                self.assertEqual(self.changelist_queries(model), before)
+
+    def test_soft_delete_and_restore_actions(self):
+        url = reverse('admin:posts_post_changelist')
+        selected = [post.pk for post in self.posts[:3]]
+        self.client.post(url, {
+            'action': 'soft_delete', '_selected_action': selected,
+        })
+        self.assertEqual(Post.objects.count(), 2)
+        response = self.client.get(url)
+        self.assertEqual(response.context['cl'].result_count, 5)
+        self.client.post(url, {
+            'action': 'restore', '_selected_action': selected,
+        })
+        self.assertEqual(Post.objects.count(), 5)
+
+    def test_soft_delete_action_invalidates_feeds(self):
+        generation = get_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:posts_post_changelist'), {
+                'action': 'soft_delete',
+                '_selected_action': [self.posts[0].pk],
+            })
+        self.assertNotEqual(get_generation(), generation)
+
+    def change_post(self, post, **data):
+        return self.client.post(
+            reverse('admin:posts_post_change', args=[post.pk]), {
+                'text': post.text, 'author': post.author_id,
+                'group': post.group_id or '', 'seen_version': post.version,
+                **data,
+            }
+        )
+
+    def test_change_form_keeps_counters(self):
+        post = self.posts[0]
+        Post.objects.filter(pk=post.pk).update(views_count=7, likes_count=3)
+        response = self.change_post(post, text='Правка', views_count=0)
+        self.assertEqual(response.status_code, 302)
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Правка')
+        self.assertEqual((post.views_count, post.likes_count), (7, 3))
+        self.assertEqual(post.version, 2)
+
+    def test_change_form_checks_version(self):
+        post = self.posts[1]
+        Post.objects.filter(pk=post.pk).update(version=2)
+        response = self.change_post(post, text='Правка')
+        self.assertEqual(response.status_code, 200)
+        post.refresh_from_db()
+        self.assertEqual(post.text, 'Запись 1')
+
+    def test_indexed_search(self):
+        url = reverse('admin:posts_post_changelist')
+        response = self.client.get(url, {'q': str(self.posts[0].pk)})
+        self.assertEqual(response.context['cl'].result_count, 1)
+        response = self.client.get(url, {'q': '@author'})
+        self.assertEqual(response.context['cl'].result_count, 5)
+        response = self.client.get(url, {'q': 'Запись 1'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_delete_follows_action(self):
+        url = reverse('admin:posts_follow_changelist')
+        selected = list(Follow.objects.values_list('pk', flat=True))
+        self.client.post(url, {
+            'action': 'delete_follows', '_selected_action': selected,
+        })
+        self.assertFalse(Follow.objects.exists())
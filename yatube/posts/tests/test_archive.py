@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import archive_posts
+from posts.models import (
+    ArchivedComment, ArchivedPost, Comment, Group, Post
+)
+from posts.signals import posts_changed
+
+User = get_user_model()
+
+
+class SoftDeleteTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Удалить', author=cls.author)
+        cls.comment = Comment.objects.create(
+            text='Удалить', author=cls.author, post=cls.post
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_deleted_rows_are_hidden(self):
+        self.comment.soft_delete()
+        self.post.soft_delete()
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(Post.all_objects.filter(is_deleted=True).exists())
+        self.assertTrue(Comment.all_objects.filter(is_deleted=True).exists())
+        response = Client().get(
+            reverse('post', args=['author', self.post.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_profile_count_excludes_deleted(self):
+        Client().get(reverse('profile', args=['author']))
+        self.post.soft_delete()
+        response = Client().get(reverse('profile', args=['author']))
+        self.assertEqual(response.context['count'], 0)
+
+
+@override_settings(ARCHIVE_AFTER=30 * 24 * 60 * 60)
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Архив', slug='archive')
+        old = timezone.now() - timedelta(days=60)
+        for number in range(15):
+            post = Post.objects.create(
+                text=f'Старая {number}', author=cls.author, group=cls.group
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=old + timedelta(minutes=number)
+            )
+        cls.old_post = post
+        Comment.objects.create(text='Отзыв', author=cls.author, post=post)
+        deleted = Post.objects.create(text='Удалённая', author=cls.author)
+        Post.objects.filter(pk=deleted.pk).update(pub_date=old)
+        deleted.soft_delete()
+        for number in range(10):
+            Post.objects.create(
+                text=f'Новая {number}', author=cls.author, group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_archive_moves_old_rows(self):
+        self.assertEqual(archive_posts(batch_size=4), 15)
+        self.assertEqual(Post.all_objects.count(), 10)
+        self.assertEqual(ArchivedPost.objects.count(), 15)
+        self.assertEqual(
+            ArchivedComment.objects.get().post_id, self.old_post.pk
+        )
+
+    def test_batch_sends_one_signal_not_one_per_row(self):
+        batches = []
+
+        def receiver(sender, post_ids, author_ids, **kwargs):
+            batches.append(len(post_ids))
+
+        posts_changed.connect(receiver, sender=Post)
+        self.addCleanup(posts_changed.disconnect, receiver, sender=Post)
+        with CaptureQueriesContext(connection) as queries:
+            archive_posts(batch_size=15)
+        self.assertEqual(batches, [1, 15])
+        self.assertFalse(Comment.objects.exists())
+        self.assertLess(len(queries), 30)
+
+    def test_pages_read_archive_only_when_deep(self):
+        archive_posts()
+        client = Client()
+        url = reverse('group_detail', args=['archive'])
+        client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            first = client.get(url)
+        self.assertFalse(
+            any('archivedpost' in query['sql'] for query in queries)
+        )
+        self.assertEqual(first.context['page'].paginator.count, 25)
+        second = client.get(url, {'page': 2})
+        self.assertTrue(
+            all(post.is_archived for post in second.context['page'])
+        )
+        last = client.get(url, {'page': 3})
+        self.assertEqual(len(last.context['page'].object_list), 5)
+        self.assertEqual(last.context['page'][-1].text, 'Старая 0')
+
+    def test_archived_post_page(self):
+        archive_posts()
+        response = Client().get(
+            reverse('post', args=['author', self.old_post.pk])
+        )
+        self.assertContains(response, 'Отзыв')
+        self.assertEqual(response.context['count'], 25)
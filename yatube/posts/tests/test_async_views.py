@@ -0,0 +1,32 @@
+import asyncio
+import threading
+from http import HTTPStatus
+
+from django.test import RequestFactory, TestCase, override_settings
+
+from about.views import AboutAuthorView
+from yatube.async_utils import async_view, run_sync
+
+
+class AsyncViewTests(TestCase):
+    # call_db закрывает устаревшие соединения в потоках пула, поэтому
+    # тестам нужен доступ к БД, даже если представление её не читает
+    @override_settings(ASYNC_VIEWS=False)
+    def test_sync_views_unchanged(self):
+        view = AboutAuthorView.as_view()
+        self.assertIs(async_view(view), view)
+
+    @override_settings(ASYNC_VIEWS=True)
+    def test_async_view_renders_in_pool(self):
+        view = async_view(AboutAuthorView.as_view())
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        request = RequestFactory().get('/about/author/')
+        response = asyncio.run(view(request))
+        self.assertTrue(response.is_rendered)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_run_sync_uses_pool_thread(self):
+        thread_name = asyncio.run(
+            run_sync(lambda: threading.current_thread().name)
+        )
+        self.assertTrue(thread_name.startswith('yatube-db'))
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.authors import get_author_card, get_card_key
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class AuthorCardTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        Post.objects.create(text='Запись', author=cls.author)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_card_stats(self):
+        with self.assertNumQueries(1):
+            card = get_author_card('author')
+        self.assertEqual(card.get_full_name(), 'Лев Толстой')
+        self.assertEqual(card.posts_count, 1)
+        self.assertEqual(card.followers_count, 1)
+        self.assertEqual(card.followings_count, 0)
+        self.assertIsNone(get_author_card('missing'))
+
+    def test_warm_card_without_queries(self):
+        get_author_card('author')
+        with self.assertNumQueries(0):
+            card = get_author_card('author')
+        self.assertEqual(card.posts_count, 1)
+
+    def test_invalidated_on_follow_and_new_post(self):
+        get_author_card('author')
+        Post.objects.create(text='Ещё запись', author=self.author)
+        self.assertEqual(get_author_card('author').posts_count, 2)
+        Follow.objects.filter(user=self.reader).delete()
+        self.assertEqual(get_author_card('author').followers_count, 0)
+        self.assertEqual(get_author_card('reader').followings_count, 0)
+
+    def test_cached_card_has_no_credentials(self):
+        get_author_card('author')
+        data = cache.get(get_card_key('author'))
+        self.assertIsInstance(data, dict)
+        self.assertNotIn('password', data)
+        self.assertNotIn('email', data)
+
+    def test_rename_drops_old_card(self):
+        get_author_card('reader')
+        self.reader.username = 'renamed'
+        self.reader.save()
+        self.assertIsNone(get_author_card('reader'))
+        self.assertEqual(get_author_card('renamed').pk, self.reader.pk)
+
+    def test_profile_uses_card(self):
+        client = Client()
+        response = client.get(reverse('profile', args=['author']))
+        self.assertEqual(response.context['followers'], 1)
+        self.assertEqual(response.context['count'], 1)
+        self.assertContains(response, 'Лев Толстой')
+        response = client.get(reverse('profile', args=['missing']))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,88 @@
+import gzip
+from unittest import mock
+
+from asgiref.sync import SyncToAsync
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+from yatube import middleware
+from yatube.middleware import minify_html
+
+User = get_user_model()
+
+
+class CompressionMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        for i in range(3):
+            Post.objects.create(text=f'Запись {i}', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_gzip_negotiated(self):
+        response = self.client.get(reverse('index'),
+                                   HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn('Запись 2', gzip.decompress(response.content).decode())
+
+    def test_not_compressed_without_accept_encoding(self):
+        for header in ('', 'gzip;q=0', 'identity'):
+            with self.subTest(header=header):
+                response = self.client.get(reverse('about:author'),
+                                           HTTP_ACCEPT_ENCODING=header)
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+    @override_settings(COMPRESSION_MIN_SIZE=10 ** 6)
+    def test_small_response_not_compressed(self):
+        response = self.client.get(reverse('index'),
+                                   HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_cached_page_compressed_once(self):
+        first = self.client.get(reverse('index'), HTTP_ACCEPT_ENCODING='gzip')
+        keys = [key for key in cache._cache if 'compressed:gzip' in key]
+        self.assertEqual(len(keys), 1)
+        second = self.client.get(reverse('index'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(first.content, second.content)
+
+    @override_settings(HTML_MINIFY=True)
+    def test_cached_page_minified_once(self):
+        with mock.patch.object(
+            middleware, 'minify_html', wraps=minify_html
+        ) as minify:
+            first = self.client.get(reverse('index'))
+            second = self.client.get(reverse('index'))
+        self.assertEqual(minify.call_count, 1)
+        self.assertEqual(first.content, second.content)
+
+    def test_asgi_chain_not_wrapped_in_sync_thread(self):
+        self.assertNotIsInstance(
+            ASGIHandler()._middleware_chain, SyncToAsync
+        )
+
+    @override_settings(HTML_MINIFY=True)
+    def test_html_minified(self):
+        response = self.client.get(reverse('index'))
+        self.assertNotIn(b'  ', response.content.split(b'<script')[0])
+        self.assertNotIn(b'<!--', response.content)
+
+
+class MinifyHtmlTests(TestCase):
+    def test_protected_blocks_kept(self):
+        html = (b'<div>\n    <p>a   b</p>  <!-- c -->\n</div>'
+                b'<pre>  x\n  y</pre><textarea>  z  </textarea>')
+        self.assertEqual(
+            minify_html(html),
+            b'<div>\n<p>a b</p>\n</div><pre>  x\n  y</pre>'
+            b'<textarea>  z  </textarea>'
+        )
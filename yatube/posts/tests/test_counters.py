@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.archive import archive_posts
+from posts.counters import (
+    DIRTY_SHARDS, FLUSH_LOCK_KEY, flush_views, get_dirty_key
+)
+from posts.models import ArchivedPost, Post
+
+User = get_user_model()
+
+
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.post = Post.objects.create(text='Запись', author=self.author)
+        self.url = reverse(
+            'post', kwargs={'username': 'author', 'post_id': self.post.pk}
+        )
+
+    def view(self, address, **extra):
+        return self.client.get(self.url, REMOTE_ADDR=address, **extra)
+
+    def stored_views(self):
+        return Post.objects.values_list('views_count', flat=True).get(
+            pk=self.post.pk
+        )
+
+    def test_views_buffered_until_flush(self):
+        self.view('10.0.0.1')
+        response = self.view('10.0.0.2')
+        self.assertEqual(response.context['post'].views_count, 2)
+        self.assertContains(response, 'Просмотров: 2')
+        self.assertEqual(self.stored_views(), 0)
+        self.assertEqual(flush_views(), 1)
+        self.assertEqual(self.stored_views(), 2)
+        self.assertEqual(flush_views(), 0)
+
+    def test_repeat_and_bot_views_ignored(self):
+        self.view('10.0.0.1')
+        self.view('10.0.0.1')
+        self.view('10.0.0.2', HTTP_USER_AGENT='Googlebot/2.1')
+        flush_views()
+        self.assertEqual(self.stored_views(), 1)
+
+    def test_views_after_flush_kept(self):
+        self.view('10.0.0.1')
+        flush_views()
+        self.view('10.0.0.2')
+        self.view('10.0.0.3')
+        flush_views()
+        self.assertEqual(self.stored_views(), 3)
+
+    def test_lost_dirty_mark_restored_by_next_view(self):
+        self.view('10.0.0.1')
+        cache.delete_many(
+            [get_dirty_key(shard) for shard in range(DIRTY_SHARDS)]
+        )
+        self.assertEqual(flush_views(), 0)
+        self.view('10.0.0.2')
+        flush_views()
+        self.assertEqual(self.stored_views(), 2)
+
+    def test_overlapping_flush_skipped(self):
+        self.view('10.0.0.1')
+        cache.add(FLUSH_LOCK_KEY, True)
+        self.assertEqual(flush_views(), 0)
+        cache.delete(FLUSH_LOCK_KEY)
+        self.assertEqual(flush_views(), 1)
+        self.assertEqual(self.stored_views(), 1)
+
+    def test_flush_reaches_archived_post(self):
+        self.view('10.0.0.1')
+        Post.objects.filter(pk=self.post.pk).update(pub_date='2000-01-01')
+        archive_posts()
+        flush_views()
+        self.assertEqual(
+            ArchivedPost.objects.get(pk=self.post.pk).views_count, 1
+        )
@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.feeds import bump_generation_on_commit, get_generation
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Проза', slug='prose', description='Рассказы'
+        )
+        Post.objects.create(text='Первая', author=cls.author, group=cls.group)
+        Post.objects.create(text='Вторая', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        # TestCase не фиксирует транзакцию: смена поколения, отложенная
+        # при создании данных, не выполнится и не должна блокировать новую
+        connection.feeds_bump_pending = None
+        self.client = Client()
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_site_feeds(self):
+        rss = self.read(self.client.get(reverse('index_feed', args=['rss'])))
+        self.assertIn('<rss', rss)
+        self.assertIn('Первая', rss)
+        self.assertIn('<category>Проза</category>', rss)
+        self.assertLess(rss.index('Вторая'), rss.index('Первая'))
+        atom = self.read(
+            self.client.get(reverse('index_feed', args=['atom']))
+        )
+        self.assertEqual(atom.count('<entry>'), 2)
+        response = self.client.get(reverse('index_feed', args=['json']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_group_and_author_feeds(self):
+        content = self.read(self.client.get(
+            reverse('group_feed', args=['rss', 'prose'])
+        ))
+        self.assertIn('Первая', content)
+        self.assertNotIn('Вторая', content)
+        content = self.read(self.client.get(
+            reverse('profile_feed', args=['atom', 'author'])
+        ))
+        self.assertEqual(content.count('<entry>'), 2)
+        response = self.client.get(
+            reverse('group_feed', args=['rss', 'missing'])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(FEED_ITEMS=1)
+    def test_cached_conditional_and_invalidated(self):
+        url = reverse('index_feed', args=['rss'])
+        first = self.client.get(url)
+        self.read(first)
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+        self.assertEqual(cached.content.count(b'<item>'), 1)
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(
+                url, HTTP_IF_NONE_MATCH=first['ETag']
+            )
+        self.assertEqual(not_modified.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(text='Третья', author=self.author)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Третья', self.read(response))
+
+    def test_delete_invalidates_after_commit(self):
+        generation = get_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.filter(text='Первая').delete()
+            self.assertEqual(get_generation(), generation)
+        self.assertNotEqual(get_generation(), generation)
+
+    def test_bump_scheduled_once_and_again_after_rollback(self):
+        generation = get_generation()
+        try:
+            with transaction.atomic():
+                bump_generation_on_commit()
+                raise DatabaseError
+        except DatabaseError:
+            pass
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            bump_generation_on_commit()
+            bump_generation_on_commit()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_generation(), generation + 1)
@@ -2,8 +2,10 @@ import shutil
 import tempfile
 
 from django.conf import settings
+from django.db import connection
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
@@ -89,3 +91,57 @@ class PostCreateFormTests(TestCase):
         )
         self.post_1.refresh_from_db()
         self.assertEqual(self.post_1.text, post_text_edit)
+
+    def edit(self, **data):
+        text = Post.objects.get(pk=self.post_1.pk).text
+        return self.authorized_client.post(
+            reverse('post_edit', args=[self.user.username, self.post_1.id]),
+            data={'text': text, 'group': self.group.id, **data},
+        )
+
+    def test_edit_updates_changed_fields_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.edit(text='Новый текст', version=1)
+        updates = [
+            q['sql'] for q in queries
+            if q['sql'].startswith('UPDATE "posts_post"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"text"', updates[0])
+        self.assertNotIn('"image"', updates[0])
+        self.assertNotIn('"group_id"', updates[0])
+        self.post_1.refresh_from_db()
+        self.assertEqual(self.post_1.text, 'Новый текст')
+        self.assertEqual(self.post_1.version, 2)
+
+    def test_unchanged_form_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.edit(version=1)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(any(
+            q['sql'].startswith('UPDATE "posts_post"') for q in queries
+        ))
+
+    def test_missing_version_is_rejected_after_edit(self):
+        self.edit(text='Первая правка', version=1)
+        for version in (None, '', 'abc'):
+            with self.subTest(version=version):
+                data = {'text': 'Без версии'}
+                if version is not None:
+                    data['version'] = version
+                response = self.edit(**data)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.context['form'].non_field_errors())
+                self.assertContains(response, 'name="version" value="2"')
+        self.post_1.refresh_from_db()
+        self.assertEqual(self.post_1.text, 'Первая правка')
+
+    def test_stale_version_is_rejected(self):
+        self.edit(text='Первая правка', version=1)
+        response = self.edit(text='Вторая правка', version=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].non_field_errors())
+        self.assertEqual(response.context['version'], 2)
+        self.assertContains(response, 'name="version" value="2"')
+        self.post_1.refresh_from_db()
+        self.assertEqual(self.post_1.text, 'Первая правка')
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR))
+class MediaGarbageCollectorTests(TestCase):
+    def setUp(self):
+        self.root = settings.MEDIA_ROOT
+        author = User.objects.create_user(username='author')
+        Post.objects.create(
+            text='Картинка', author=author, image='posts/used.gif',
+            thumbnail='cache/ab/used.jpg',
+        )
+        old = time.time() - 2 * 24 * 60 * 60
+        for name in ('posts/used.gif', 'posts/orphan.gif',
+                     'cache/ab/used.jpg', 'cache/cd/orphan.jpg',
+                     'posts/fresh.gif'):
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(b'x' * 2048)
+            if name != 'posts/fresh.gif':
+                os.utime(path, (old, old))
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.root, name))
+
+    def test_dry_run_reports_only(self):
+        out = StringIO()
+        call_command('gc_media', dry_run=True, progress=2, stdout=out)
+        output = out.getvalue()
+        self.assertIn('Сирота: posts/orphan.gif', output)
+        self.assertIn('Сирота: cache/cd/orphan.jpg', output)
+        self.assertIn('Просмотрено: 2', output)
+        self.assertIn('Найдено сирот: 2', output)
+        self.assertTrue(self.exists('posts/orphan.gif'))
+
+    def test_orphans_removed(self):
+        call_command('gc_media', stdout=StringIO())
+        self.assertFalse(self.exists('posts/orphan.gif'))
+        self.assertFalse(self.exists('cache/cd/orphan.jpg'))
+        self.assertTrue(self.exists('posts/used.gif'))
+        self.assertTrue(self.exists('cache/ab/used.jpg'))
+        self.assertTrue(self.exists('posts/fresh.gif'))
+
+    def test_quarantine(self):
+        quarantine = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, quarantine, True)
+        call_command('gc_media', quarantine=quarantine, stdout=StringIO())
+        self.assertFalse(self.exists('posts/orphan.gif'))
+        self.assertTrue(
+            os.path.exists(os.path.join(quarantine, 'posts/orphan.gif'))
+        )
@@ -0,0 +1,118 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.likes import (
+    attach_likes, fold_shards, like_post, rebalance_shards, unlike_post
+)
+from posts.models import Like, LikeShard, Post
+from posts.trending import bump
+
+User = get_user_model()
+
+
+class LikeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.posts = [
+            Post.objects.create(text=f'Запись {i}', author=self.author)
+            for i in range(3)
+        ]
+        self.post = self.posts[0]
+
+    def likes_count(self, post):
+        return Post.objects.values_list('likes_count', flat=True).get(
+            pk=post.pk
+        )
+
+    def test_like_toggle_keeps_counter(self):
+        self.assertTrue(like_post(self.reader, self.post))
+        self.assertFalse(like_post(self.reader, self.post))
+        self.assertEqual(self.likes_count(self.post), 1)
+        self.assertTrue(unlike_post(self.reader, self.post))
+        self.assertFalse(unlike_post(self.reader, self.post))
+        self.assertEqual(self.likes_count(self.post), 0)
+
+    def test_liked_by_me_in_one_query(self):
+        like_post(self.reader, self.posts[1])
+        posts = list(Post.objects.all())
+        with self.assertNumQueries(1):
+            attach_likes(posts, self.reader)
+        self.assertEqual(
+            [post.liked for post in posts],
+            [post.pk == self.posts[1].pk for post in posts],
+        )
+
+    @override_settings(LIKES_HOT_THRESHOLD=2, LIKES_SHARDS=4)
+    def test_sharded_counter(self):
+        like_post(self.reader, self.post)
+        like_post(self.author, self.post)
+        self.assertEqual(rebalance_shards(), 1)
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.like_shards, 4)
+        fan = User.objects.create_user(username='fan')
+        like_post(fan, post)
+        self.assertEqual(self.likes_count(post), 2)
+        attach_likes([post], fan)
+        self.assertEqual(post.likes_count, 3)
+        self.assertTrue(post.liked)
+        self.assertEqual(fold_shards(), 1)
+        self.assertEqual(self.likes_count(post), 3)
+        self.assertFalse(LikeShard.objects.exclude(count=0).exists())
+
+    @override_settings(LIKES_HOT_THRESHOLD=2)
+    def test_cooled_post_unsharded(self):
+        like_post(self.reader, self.post)
+        like_post(self.author, self.post)
+        rebalance_shards()
+        post = Post.objects.get(pk=self.post.pk)
+        unlike_post(self.author, post)
+        rebalance_shards()
+        post.refresh_from_db()
+        self.assertEqual(post.like_shards, 0)
+        self.assertEqual(post.likes_count, 1)
+        self.assertFalse(LikeShard.objects.filter(post=post).exists())
+
+    def test_like_view(self):
+        url = reverse('post_like', kwargs={
+            'username': 'author', 'post_id': self.post.pk
+        })
+        self.client.force_login(self.reader)
+        response = self.client.post(url, {'next': reverse('index')})
+        self.assertRedirects(response, reverse('index'))
+        self.assertTrue(
+            Like.objects.filter(user=self.reader, post=self.post).exists()
+        )
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, 'value="unlike"')
+        self.client.post(url, {'action': 'unlike', 'next': 'http://evil/'})
+        self.assertEqual(self.likes_count(self.post), 0)
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+    def test_cached_pages_not_shared_between_users(self):
+        like_post(self.reader, self.post)
+        bump(self.post.pk)
+        readers = []
+        for user in (self.reader, self.author):
+            client = self.client_class(enforce_csrf_checks=True)
+            client.force_login(user)
+            readers.append(client)
+        for name in ('index', 'trending'):
+            with self.subTest(name=name):
+                cache.clear()
+                first = readers[0].get(reverse(name))
+                self.assertContains(first, 'value="unlike"')
+                second = readers[1].get(reverse(name))
+                self.assertNotContains(second, 'value="unlike"')
+                self.assertNotEqual(
+                    first.context['csrf_token'],
+                    second.context['csrf_token'],
+                )
+        token = readers[1].cookies['csrftoken'].value
+        response = readers[1].post(self.post.get_like_url(), {
+            'action': 'like', 'csrfmiddlewaretoken': token,
+        })
+        self.assertEqual(response.status_code, 302)
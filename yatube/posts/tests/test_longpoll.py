@@ -0,0 +1,90 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts.longpoll import application
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class NewPostsSinceViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.old_post = Post.objects.create(text='Старая', author=cls.author)
+        cls.new_post = Post.objects.create(text='Новая', author=cls.author)
+        cls.other_post = Post.objects.create(text='Чужая', author=cls.other)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_index_feed(self):
+        response = self.guest_client.get(
+            reverse('new_posts_since'), {'cursor': self.old_post.id}
+        )
+        self.assertEqual(response.json(), {
+            'cursor': self.other_post.id,
+            'count': 2,
+            'ids': [self.other_post.id, self.new_post.id],
+        })
+
+    def test_follow_feed(self):
+        response = self.authorized_client.get(
+            reverse('new_posts_since'),
+            {'feed': 'follow', 'cursor': self.old_post.id}
+        )
+        self.assertEqual(response.json()['ids'], [self.new_post.id])
+
+    def test_follow_feed_anonymous(self):
+        response = self.guest_client.get(
+            reverse('new_posts_since'), {'feed': 'follow'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+
+class LongPollApplicationTests(TransactionTestCase):
+    def call(self, query_string):
+        messages = []
+
+        async def receive():
+            await asyncio.sleep(10)
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            'type': 'http',
+            'path': '/api/new-since/',
+            'query_string': query_string,
+            'headers': [],
+        }
+        asyncio.run(application(scope, receive, send))
+        return messages[0]['status'], json.loads(messages[1]['body'])
+
+    def test_returns_new_posts(self):
+        author = User.objects.create_user(username='author')
+        post = Post.objects.create(text='Новая', author=author)
+        status, data = self.call(f'cursor={post.id - 1}'.encode())
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertEqual(data['ids'], [post.id])
+
+    def test_timeout_without_new_posts(self):
+        status, data = self.call(b'cursor=0&timeout=1')
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertEqual(data, {'cursor': 0, 'count': 0, 'ids': []})
+
+    def test_follow_feed_requires_session(self):
+        status, _ = self.call(b'feed=follow')
+        self.assertEqual(status, HTTPStatus.FORBIDDEN)
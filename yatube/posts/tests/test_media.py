@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.conf import settings
+from django.test import Client, SimpleTestCase, override_settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = bytes(range(256)) * 4
+
+
+def deny_all(request, path):
+    return False
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaServeTests(SimpleTestCase):
+    url = '/media/posts/image.gif'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'posts'))
+        path = os.path.join(TEMP_MEDIA_ROOT, 'posts', 'image.gif')
+        with open(path, 'wb') as file:
+            file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_full_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+
+    def test_ranges(self):
+        ranges = {
+            'bytes=10-19': (CONTENT[10:20], 'bytes 10-19/1024'),
+            'bytes=1000-': (CONTENT[1000:], 'bytes 1000-1023/1024'),
+            'bytes=-4': (CONTENT[-4:], 'bytes 1020-1023/1024'),
+            'bytes=1020-5000': (CONTENT[1020:], 'bytes 1020-1023/1024'),
+        }
+        for header, (body, content_range) in ranges.items():
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.PARTIAL_CONTENT)
+                self.assertEqual(response['Content-Range'], content_range)
+                self.assertEqual(response['Content-Length'], str(len(body)))
+                self.assertEqual(b''.join(response.streaming_content), body)
+
+    def test_range_not_satisfiable(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2000-')
+        self.assertEqual(response.status_code,
+                         HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_stale_if_range_returns_full_file(self):
+        response = self.client.get(
+            self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url)
+        for header, value in (
+            ('HTTP_IF_NONE_MATCH', response['ETag']),
+            ('HTTP_IF_MODIFIED_SINCE', response['Last-Modified']),
+        ):
+            with self.subTest(header=header):
+                cached = self.client.get(self.url, **{header: value})
+                self.assertEqual(cached.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_missing_and_traversal(self):
+        for url in ('/media/posts/missing.gif', '/media/../manage.py',
+                    '/media/posts/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    @override_settings(MEDIA_ACCEL='x-accel-redirect')
+    def test_accel_redirect(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected-media/posts/image.gif')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_PERMISSION='posts.tests.test_media.deny_all')
+    def test_permission_hook(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
@@ -1,4 +1,5 @@
 from django.test import TestCase
+from django.urls import reverse
 
 from posts.models import Group, Post, User
 
@@ -19,6 +20,11 @@ class GroupModelTest(TestCase):
         expected_object_name = group.title
         self.assertEqual(expected_object_name, str(group))
 
+    def test_group_absolute_url(self):
+        group = GroupModelTest.group
+        self.assertEqual(group.get_absolute_url(),
+                         reverse('group_detail', args=[group.slug]))
+
 
 class PostModelTest(TestCase):
     @classmethod
@@ -35,3 +41,21 @@ class PostModelTest(TestCase):
         post = PostModelTest.post
         expected_object_name = post.text[:15]
         self.assertEqual(expected_object_name, str(post))
+
+    def test_post_urls_match_reverse(self):
+        """Ссылки модели совпадают с reverse(), в том числе для имён со
+        спецсимволами."""
+        for username in ('user', 'user.name+tag@mail'):
+            with self.subTest(username=username):
+                self.user.username = username
+                post = PostModelTest.post
+                self.assertEqual(
+                    post.get_absolute_url(),
+                    reverse('post', args=[username, post.pk])
+                )
+                self.assertEqual(
+                    post.get_edit_url(),
+                    reverse('post_edit', args=[username, post.pk])
+                )
+                self.assertEqual(post.get_author_url(),
+                                 reverse('profile', args=[username]))
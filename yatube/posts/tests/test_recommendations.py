@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, Recommendation
+from posts.recommendations import (
+    FollowGraph, build_recommendations, get_recommendations
+)
+
+User = get_user_model()
+
+
+class RecommendationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = {
+            name: User.objects.create_user(username=name)
+            for name in ('reader', 'friend', 'writer', 'poet', 'star', 'fan')
+        }
+        group = Group.objects.create(title='Стихи', slug='poems')
+        u = cls.users
+        for user, author in (('reader', 'friend'), ('friend', 'writer'),
+                             ('friend', 'reader'), ('fan', 'star'),
+                             ('fan', 'writer')):
+            Follow.objects.create(user=u[user], author=u[author])
+        Post.objects.create(text='Стих', author=u['friend'], group=group)
+        Post.objects.create(text='Ода', author=u['star'], group=group)
+
+    def test_graph_adjacency(self):
+        graph = FollowGraph.load()
+        friend = self.users['friend']
+        self.assertEqual(
+            sorted(graph.following(friend.pk)),
+            sorted([self.users['writer'].pk, self.users['reader'].pk])
+        )
+        self.assertEqual(list(graph.following(self.users['star'].pk)), [])
+
+    def test_build(self):
+        build_recommendations()
+        authors = [
+            item.author.username
+            for item in get_recommendations(self.users['reader'])
+        ]
+        self.assertEqual(authors, ['writer', 'star'])
+        self.assertFalse(
+            Recommendation.objects.filter(user=self.users['star']).exists()
+        )
+
+    def test_user_without_follows_gets_popular_authors(self):
+        build_recommendations()
+        Follow.objects.filter(user=self.users['reader']).delete()
+        call_command('build_recommendations', stdout=StringIO())
+        authors = [
+            item.author.username
+            for item in get_recommendations(self.users['reader'])
+        ]
+        self.assertEqual(authors, ['writer', 'star'])
+
+    def test_follow_page_shows_recommendations(self):
+        build_recommendations()
+        client = Client()
+        client.force_login(self.users['reader'])
+        with self.assertNumQueries(6):
+            response = client.get(reverse('follow_index'))
+        self.assertContains(response, 'Кого почитать')
+        self.assertContains(response, reverse('profile', args=['writer']))
+
+    def test_profile_shows_viewer_recommendations(self):
+        build_recommendations()
+        client = Client()
+        client.force_login(self.users['reader'])
+        response = client.get(reverse('profile', args=['friend']))
+        self.assertContains(response, reverse('profile', args=['star']))
+        response = Client().get(reverse('profile', args=['friend']))
+        self.assertNotContains(response, 'Кого почитать')
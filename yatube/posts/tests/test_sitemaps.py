@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from posts.archive import archive_posts
+from posts.models import Group, Post
+from tasks.models import Job
+from posts.sitemaps import build_sitemaps, get_sitemap_root
+
+User = get_user_model()
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR),
+    SITEMAP_CHUNK_SIZE=2,
+)
+class SitemapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.group = Group.objects.create(title='Группа', slug='group')
+        self.posts = [
+            Post.objects.create(
+                text=f'Запись {i}', author=self.author, group=self.group
+            )
+            for i in range(5)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def read(self, name):
+        with open(os.path.join(get_sitemap_root(), name),
+                  encoding='utf-8') as file:
+            return file.read()
+
+    def test_chunks_cover_posts_by_id(self):
+        build_sitemaps()
+        urls = ''.join(
+            self.read(f'sitemap-posts-{chunk}.xml')
+            for chunk in range(self.posts[-1].pk // 2 + 1)
+        )
+        for post in self.posts:
+            self.assertIn(f'/author/{post.pk}/</loc>', urls)
+        index = self.read('sitemap.xml')
+        self.assertIn(f'{settings.SITE_URL}/sitemap-groups-0.xml', index)
+        self.assertIn('/group/group/', self.read('sitemap-groups-0.xml'))
+
+    def test_only_tail_chunk_rebuilt(self):
+        build_sitemaps()
+        Post.objects.create(text='Новая', author=self.author)
+        written = build_sitemaps()
+        posts = [name for name in written if name.startswith('sitemap-posts')]
+        tail = Post.objects.latest('pk').pk // 2
+        self.assertEqual(posts, [f'sitemap-posts-{tail}.xml'])
+
+    def test_full_rebuild_drops_deleted_posts(self):
+        build_sitemaps()
+        post = self.posts[0]
+        post.soft_delete()
+        build_sitemaps(full=True)
+        name = f'sitemap-posts-{post.pk // 2}.xml'
+        self.assertNotIn(f'/author/{post.pk}/<', self.read(name))
+
+    def test_hidden_post_chunk_rebuilt(self):
+        build_sitemaps()
+        post = self.posts[0]
+        post.soft_delete()
+        written = build_sitemaps()
+        name = f'sitemap-posts-{post.pk // 2}.xml'
+        self.assertIn(name, written)
+        self.assertNotIn(f'/author/{post.pk}/<', self.read(name))
+
+    @override_settings(SITEMAP_CHUNK_SIZE=1)
+    def test_author_chunk_rebuilt_on_new_post(self):
+        build_sitemaps()
+        User.objects.create_user(username='newcomer')
+        Post.objects.create(text='Новая', author=self.author)
+        written = build_sitemaps()
+        self.assertIn(f'sitemap-authors-{self.author.pk}.xml', written)
+
+    def test_author_lastmod_counts_archive_not_hidden(self):
+        hidden = User.objects.create_user(username='hidden')
+        Post.objects.create(text='Скрытая', author=hidden).soft_delete()
+        Post.objects.filter(author=self.author).update(
+            pub_date='2000-01-01T00:00:00Z'
+        )
+        archive_posts()
+        build_sitemaps()
+        authors = ''.join(
+            self.read(f'sitemap-authors-{chunk}.xml')
+            for chunk in range(hidden.pk // 2 + 1)
+        )
+        self.assertIn('/author/</loc><lastmod>2000-01-01<', authors)
+        self.assertNotIn('/hidden/', authors)
+        self.assertIn(
+            '/group/group/</loc><lastmod>2000-01-01<',
+            self.read('sitemap-groups-0.xml'),
+        )
+
+    def test_update_enqueued_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(text='Новая', author=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(text='Ещё', author=self.author)
+        self.assertEqual(
+            Job.objects.filter(name='posts.tasks.update_sitemaps').count(), 1
+        )
+
+    def test_served_from_site_root(self):
+        build_sitemaps()
+        response = self.client.get('/sitemap.xml')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'<sitemapindex', b''.join(response.streaming_content))
+        response = self.client.get('/sitemap-posts-0.xml')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/sitemap-posts-99.xml')
+        self.assertEqual(response.status_code, 404)
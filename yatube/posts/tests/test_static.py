@@ -0,0 +1,109 @@
+import asyncio
+import gzip
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import (
+    Client, RequestFactory, SimpleTestCase, override_settings
+)
+
+from yatube.middleware import StaticFilesMiddleware
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+TEMP_COLLECT_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+TEMP_STATIC_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CSS = b'body { margin: 0; }\n' * 100
+
+
+@override_settings(STATIC_ROOT=TEMP_STATIC_ROOT)
+class StaticFilesMiddlewareTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name, content in (
+            ('app.0123456789ab.css', CSS),
+            ('app.0123456789ab.css.gz', gzip.compress(CSS)),
+            ('app.css', CSS),
+        ):
+            with open(os.path.join(TEMP_STATIC_ROOT, name), 'wb') as file:
+                file.write(content)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_hashed_file_immutable(self):
+        response = self.client.get('/static/app.0123456789ab.css')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(b''.join(response.streaming_content), CSS)
+
+    def test_not_hashed_file_short_cache(self):
+        response = self.client.get('/static/app.css')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_precompressed_variant(self):
+        response = self.client.get(
+            '/static/app.0123456789ab.css', HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)), CSS
+        )
+
+    def test_if_none_match(self):
+        etag = self.client.get('/static/app.0123456789ab.css')['ETag']
+        response = self.client.get(
+            '/static/app.0123456789ab.css', HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_async_chain_stays_async(self):
+        async def get_response(request):
+            return 'view'
+
+        middleware = StaticFilesMiddleware(get_response)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        factory = RequestFactory()
+        response = asyncio.run(
+            middleware(factory.get('/static/app.0123456789ab.css'))
+        )
+        self.assertEqual(b''.join(response.streaming_content), CSS)
+        self.assertEqual(asyncio.run(middleware(factory.get('/'))), 'view')
+
+    def test_path_traversal(self):
+        response = self.client.get('/static/../manage.py')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+@override_settings(
+    STATIC_ROOT=TEMP_COLLECT_ROOT,
+    STATICFILES_DIRS=[TEMP_STATIC_DIR],
+    STATICFILES_STORAGE='yatube.storage.CompressedManifestStaticFilesStorage',
+)
+class CompressedManifestStorageTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_COLLECT_ROOT, ignore_errors=True)
+        shutil.rmtree(TEMP_STATIC_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_collectstatic_writes_compressed_copies(self):
+        with open(os.path.join(TEMP_STATIC_DIR, 'site.css'), 'wb') as file:
+            file.write(CSS)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        names = os.listdir(TEMP_COLLECT_ROOT)
+        hashed = [name for name in names
+                  if name.startswith('site.') and name.endswith('.css')
+                  and name != 'site.css']
+        self.assertEqual(len(hashed), 1)
+        self.assertIn(hashed[0] + '.gz', names)
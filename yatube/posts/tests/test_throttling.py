@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(
+    RATE_LIMITS={'follow': '2/m', 'add_comment': '1/m'},
+    IP_RATE_LIMITS={'follow': '3/m'},
+)
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(
+            text='Пост для проверки ограничений',
+            author=cls.author,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_follow_rate_limited(self):
+        url = reverse('profile_follow', args=[self.author.username])
+        for _ in range(2):
+            response = self.authorized_client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_ip_has_own_higher_limit(self):
+        url = reverse('profile_follow', args=[self.author.username])
+        other_client = Client()
+        other_client.force_login(self.author)
+        self.authorized_client.get(url)
+        self.authorized_client.get(url)
+        response = other_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = other_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+
+    def test_rejected_requests_not_counted(self):
+        url = reverse('profile_follow', args=[self.author.username])
+        for _ in range(5):
+            self.authorized_client.get(url)
+        other_client = Client()
+        other_client.force_login(self.author)
+        response = other_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_only_write_methods_limited(self):
+        url = reverse('add_comment', args=[self.author.username, self.post.id])
+        for _ in range(3):
+            response = self.authorized_client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.authorized_client.post(url, {'text': 'Комментарий'})
+        response = self.authorized_client.post(url, {'text': 'Ещё один'})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(self.post.comments.count(), 1)
+
+    @override_settings(RATE_LIMIT_PROXY_COUNT=1)
+    def test_ip_taken_from_trusted_proxy_header(self):
+        url = reverse('profile_follow', args=[self.author.username])
+        other_client = Client()
+        other_client.force_login(self.author)
+        for client, address in ((self.authorized_client, '10.0.0.1'),
+                                (other_client, '10.0.0.2')):
+            for _ in range(2):
+                response = client.get(
+                    url, REMOTE_ADDR='192.168.0.1',
+                    HTTP_X_FORWARDED_FOR=f'1.2.3.4, {address}',
+                )
+                self.assertEqual(response.status_code, HTTPStatus.FOUND)
@@ -0,0 +1,149 @@
+import json
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from posts.models import Post
+from posts.tasks import make_post_thumbnail
+from posts.thumbnails import attach_thumbnails, get_cache_key
+from tasks.models import Job
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def make_image(name='small.gif'):
+    return SimpleUploadedFile(name, SMALL_GIF, content_type='image/gif')
+
+
+def make_photo(width, name='photo.png'):
+    content = BytesIO()
+    Image.new('RGB', (width, width // 2), 'teal').save(content, 'PNG')
+    return SimpleUploadedFile(name, content.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='С картинкой', author=self.author, image=make_image()
+        )
+
+    def test_task_persists_thumbnail(self):
+        make_post_thumbnail(self.post.pk)
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.thumbnail)
+        self.assertEqual(
+            (self.post.thumbnail_width, self.post.thumbnail_height),
+            (960, 339)
+        )
+
+    def test_feed_renders_without_thumbnail_store(self):
+        make_post_thumbnail(self.post.pk)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = Client().get(reverse('profile', args=['author']))
+        self.assertFalse(
+            any('thumbnail_kvstore' in query['sql'] for query in queries)
+        )
+        self.assertContains(response, 'width="960" height="339"')
+
+    def test_cached_metadata_used_before_row_is_updated(self):
+        make_post_thumbnail(self.post.pk)
+        Post.objects.filter(pk=self.post.pk).update(thumbnail='')
+        post = Post.objects.get(pk=self.post.pk)
+        with self.assertNumQueries(0):
+            attach_thumbnails([post])
+        self.assertEqual(
+            post.card_image, cache.get(get_cache_key(post.image.name))
+        )
+        self.assertEqual(post.card_image['width'], 960)
+
+    def test_missing_metadata_requeued_once(self):
+        Job.objects.all().delete()
+        posts = [Post.objects.get(pk=self.post.pk) for _ in range(2)]
+        with self.captureOnCommitCallbacks(execute=True):
+            attach_thumbnails(posts[:1])
+            attach_thumbnails(posts[1:])
+        self.assertIsNone(posts[0].card_image)
+        self.assertEqual(
+            list(Job.objects.values_list('name', flat=True)),
+            ['posts.tasks.make_post_thumbnail'],
+        )
+
+    def test_new_image_resets_thumbnail(self):
+        make_post_thumbnail(self.post.pk)
+        client = Client()
+        client.force_login(self.author)
+        client.post(
+            reverse('post_edit', args=['author', self.post.pk]),
+            {'text': 'С картинкой', 'image': make_image('other.gif')},
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.thumbnail, '')
+        self.assertIsNone(self.post.thumbnail_width)
+
+    def test_variants_not_wider_than_source(self):
+        post = Post.objects.create(
+            text='Фото', author=self.author, image=make_photo(700)
+        )
+        make_post_thumbnail(post.pk)
+        post.refresh_from_db()
+        variants = json.loads(post.thumbnail_variants)
+        self.assertEqual([v['width'] for v in variants], [320, 640])
+        self.assertEqual([v['height'] for v in variants], [113, 226])
+        self.assertTrue(variants[0]['webp'].endswith('.webp'))
+        self.assertTrue(variants[0]['jpeg'].endswith('.jpg'))
+
+    def test_cards_emit_srcset_and_lazy_loading(self):
+        older = Post.objects.create(
+            text='Фото', author=self.author, image=make_photo(700)
+        )
+        make_post_thumbnail(self.post.pk)
+        make_post_thumbnail(older.pk)
+        Post.objects.filter(pk=self.post.pk).update(pub_date=older.pub_date)
+        Post.objects.filter(pk=older.pk).update(
+            pub_date=older.pub_date.replace(year=2000)
+        )
+        content = Client().get(
+            reverse('profile', args=['author'])
+        ).content.decode()
+        self.assertEqual(content.count('<picture>'), 2)
+        self.assertEqual(content.count('type="image/webp"'), 2)
+        self.assertIn('640w', content)
+        self.assertEqual(content.count('loading="lazy"'), 1)
+        self.assertEqual(content.count('fetchpriority="high"'), 1)
+        self.assertLess(
+            content.index('fetchpriority'), content.index('loading="lazy"')
+        )
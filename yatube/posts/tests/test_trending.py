@@ -0,0 +1,69 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, TrendingEpoch
+from posts.trending import bump, compact, trending_groups, trending_posts
+
+User = get_user_model()
+
+
+@override_settings(TRENDING_HALF_LIFE=3600, TRENDING_MIN_SCORE=0.01)
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Проза', slug='prose')
+        cls.old = Post.objects.create(text='Старая', author=cls.author)
+        cls.fresh = Post.objects.create(
+            text='Свежая', author=cls.author, group=cls.group
+        )
+        TrendingEpoch.objects.filter(pk=1).update(timestamp=1000000.0)
+
+    def score(self, post):
+        post.refresh_from_db(fields=['trending_score'])
+        return post.trending_score
+
+    def test_later_events_outweigh_earlier(self):
+        bump(self.old.pk, weight=3, now=1000000.0)
+        bump(self.fresh.pk, self.group.pk, weight=1, now=1000000.0 + 7200)
+        self.assertAlmostEqual(self.score(self.old), 3)
+        self.assertAlmostEqual(self.score(self.fresh), 4)
+        self.assertEqual(
+            list(trending_posts()), [self.fresh, self.old]
+        )
+        self.assertEqual(list(trending_posts(self.group)), [self.fresh])
+        self.assertEqual(list(trending_groups()), [self.group])
+
+    def test_compact_rebases_and_drops_faded(self):
+        bump(self.old.pk, weight=1, now=1000000.0)
+        bump(self.fresh.pk, weight=1, now=1000000.0 + 3600 * 8)
+        compact(now=1000000.0 + 3600 * 10)
+        self.assertEqual(self.score(self.old), 0)
+        self.assertAlmostEqual(self.score(self.fresh), 0.25)
+        self.assertEqual(TrendingEpoch.objects.get().timestamp,
+                         1000000.0 + 3600 * 10)
+
+    def test_comment_and_follow_bump_scores(self):
+        TrendingEpoch.objects.filter(pk=1).update(timestamp=time.time())
+        reader = User.objects.create_user(username='reader')
+        Comment.objects.create(text='!', author=reader, post=self.old)
+        Follow.objects.create(user=reader, author=self.author)
+        self.assertGreater(self.score(self.old), 0)
+        self.assertGreater(self.score(self.fresh), 0)
+        self.group.refresh_from_db()
+        self.assertGreater(self.group.trending_score, 0)
+
+    def test_pages(self):
+        TrendingEpoch.objects.filter(pk=1).update(timestamp=time.time())
+        bump(self.fresh.pk, self.group.pk)
+        response = Client().get(reverse('trending'))
+        self.assertContains(response, 'Свежая')
+        self.assertNotContains(response, 'Старая')
+        response = Client().get(
+            reverse('group_trending', args=[self.group.slug])
+        )
+        self.assertContains(response, 'Свежая')
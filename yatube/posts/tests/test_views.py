@@ -11,7 +11,7 @@ from django.contrib.auth import get_user_model
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
-from posts.models import Group, Post, Follow
+from posts.models import Comment, Group, Post, Follow
 
 User = get_user_model()
 
@@ -305,3 +305,47 @@ class CommentTests(TestCase):
         )
         self.assertIsInstance(response.context['form'].fields['text'],
                               forms.fields.CharField)
+
+
+class FeedCardTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='Заголовок тестовой группы',
+            description='Описание тестовой группы',
+            slug='test-group'
+        )
+        for i in range(5):
+            post = Post.objects.create(
+                text=f'Содержимое тестового поста {i}',
+                author=cls.user,
+                group=cls.group
+            )
+            Comment.objects.create(text='Комментарий', author=cls.user,
+                                   post=post)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_feed_queries_do_not_depend_on_posts_count(self):
+        cache.clear()
+        with self.assertNumQueries(3):
+            response = self.guest_client.get(reverse('index'))
+        self.assertContains(response, 'Комментариев: 1', count=5)
+
+    def test_card_links(self):
+        post = Post.objects.first()
+        response = self.guest_client.get(
+            reverse('group_detail', args=[self.group.slug])
+        )
+        self.assertContains(
+            response, reverse('post', args=[self.user.username, post.id])
+        )
+        self.assertContains(
+            response, reverse('profile', args=[self.user.username])
+        )
+        self.assertNotContains(
+            response, reverse('post_edit', args=[self.user.username, post.id])
+        )
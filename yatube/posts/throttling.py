@@ -0,0 +1,99 @@
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60): разрешённое число запросов и период в секундах."""
+    count, period = rate.split('/')
+    return int(count), RATE_PERIODS[period[0]]
+
+
+def get_client_ip(request):
+    """Адрес клиента. За RATE_LIMIT_PROXY_COUNT доверенными прокси
+    REMOTE_ADDR - адрес ближайшего из них, а адрес клиента дописал в
+    X-Forwarded-For самый внешний: он N-й с конца. Записи левее могут
+    быть подделаны клиентом и не используются."""
+    proxies = settings.RATE_LIMIT_PROXY_COUNT
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if proxies and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',')]
+        return addresses[-min(proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def get_buckets(scope, request):
+    """Пары (ключ, предел): адрес со своим пределом IP_RATE_LIMITS и
+    пользователь с пределом RATE_LIMITS."""
+    buckets = []
+    ip_rate = settings.IP_RATE_LIMITS.get(scope)
+    if ip_rate is not None:
+        buckets.append((f'ip:{get_client_ip(request)}', ip_rate))
+    rate = settings.RATE_LIMITS.get(scope)
+    if rate is not None and request.user.is_authenticated:
+        buckets.append((f'user:{request.user.pk}', rate))
+    return [
+        (f'ratelimit:{scope}:{key}', rate) for key, rate in buckets
+    ]
+
+
+def take_token(scope, request):
+    """Забирает токен из корзин пользователя и IP.
+
+    Корзина хранится в кэше и целиком пополняется раз в период (по сути
+    счётчик фиксированного окна); счётчик увеличивается атомарно через
+    cache.incr. Отклонённый запрос возвращает
+    взятые токены, чтобы повторы не продлевали блокировку. Возвращает 0,
+    если запрос разрешён, иначе число секунд до пополнения корзины.
+    """
+    now = time.time()
+    retry_after = 0
+    taken = []
+    for key, rate in get_buckets(scope, request):
+        limit, period = parse_rate(rate)
+        key = f'{key}:{int(now // period)}'
+        cache.add(key, 0, period)
+        try:
+            used = cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, period)
+            used = 1
+        taken.append(key)
+        if used > limit:
+            retry_after = max(retry_after, int(period - now % period) + 1)
+    if retry_after:
+        for key in taken:
+            try:
+                cache.decr(key)
+            except ValueError:
+                pass
+    return retry_after
+
+
+def too_many_requests(request, retry_after):
+    response = render(
+        request,
+        'misc/429.html',
+        {'retry_after': retry_after},
+        status=429
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(scope, methods=('POST',)):
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods:
+                retry_after = take_token(scope, request)
+                if retry_after:
+                    return too_many_requests(request, retry_after)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,120 @@
+"""Метаданные миниатюр карточек.
+
+Путь и размеры готовой миниатюры и её вариантов разной ширины (WebP и
+JPEG для srcset) хранятся в строке записи; их заполняет задача
+make_post_thumbnail, поэтому карточке не нужно обращаться к хранилищу
+sorl-thumbnail. Пока строка не обновлена, метаданные ищутся в кэше
+одним get_many на страницу; задача работает в воркере, поэтому кэш
+должен быть общим (posts.W001). Если нет и там, шаблон строит миниатюру
+тегом {% thumbnail %}, как раньше: так бывает только с только что
+загруженным изображением, пока задача в очереди, и со старыми записями
+до backfill_thumbnails, и каждая такая карточка ставит задачу сама.
+"""
+import json
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from sorl.thumbnail import get_thumbnail
+
+POST_THUMBNAIL = '960x339'
+POST_THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+VARIANT_WIDTHS = (320, 640, 960, 1920)
+VARIANT_FORMATS = (('webp', 'WEBP'), ('jpeg', 'JPEG'))
+# Ширина карточки при вёрстке Bootstrap: на узких экранах во всю ширину
+CARD_SIZES = '(min-width: 1200px) 1110px, (min-width: 992px) 930px, 100vw'
+# Как часто (секунды) карточка без метаданных может заново поставить
+# задачу миниатюры для своего изображения
+REQUEUE_TIMEOUT = 60 * 60
+
+
+def get_cache_key(image_name):
+    return f'thumbnail:{POST_THUMBNAIL}:{image_name}'
+
+
+def make_variants(image):
+    """Варианты миниатюры не шире исходного изображения (хотя бы один)."""
+    base_width, base_height = map(int, POST_THUMBNAIL.split('x'))
+    widths = [
+        width for width in VARIANT_WIDTHS if width <= image.width
+    ] or VARIANT_WIDTHS[:1]
+    variants = []
+    for width in widths:
+        height = round(width * base_height / base_width)
+        variant = {'width': width, 'height': height}
+        for key, image_format in VARIANT_FORMATS:
+            variant[key] = get_thumbnail(
+                image, f'{width}x{height}', format=image_format,
+                **POST_THUMBNAIL_OPTIONS
+            ).name
+        variants.append(variant)
+    return variants
+
+
+def get_srcset(variants, key):
+    return ', '.join(
+        f'{default_storage.url(variant[key])} {variant["width"]}w'
+        for variant in variants
+    )
+
+
+def load_variants(variants):
+    try:
+        return json.loads(variants) if variants else []
+    except ValueError:
+        return []
+
+
+def describe(name, width, height, variants=''):
+    variants = load_variants(variants)
+    return {
+        'url': default_storage.url(name),
+        'width': width,
+        'height': height,
+        'srcset': get_srcset(variants, 'jpeg'),
+        'webp_srcset': get_srcset(variants, 'webp'),
+        'sizes': CARD_SIZES,
+    }
+
+
+def attach_thumbnails(posts):
+    """Заполняет post.card_image: словарь из describe() или None."""
+    missing = [post for post in posts if post.image and not post.thumbnail]
+    cached = cache.get_many(
+        [get_cache_key(post.image.name) for post in missing]
+    ) if missing else {}
+    for post in posts:
+        if post.thumbnail:
+            post.card_image = describe(
+                post.thumbnail, post.thumbnail_width, post.thumbnail_height,
+                post.thumbnail_variants
+            )
+        elif post.image:
+            post.card_image = cached.get(get_cache_key(post.image.name))
+        else:
+            post.card_image = None
+    queue_missing([
+        post for post in missing
+        if post.card_image is None and not post.is_archived
+    ])
+
+
+def queue_missing(posts):
+    """Ставит задачу миниатюры записям, у которых метаданных нет ни в
+    строке, ни в кэше: не чаще раза в REQUEUE_TIMEOUT на изображение."""
+    from tasks.queue import enqueue_on_commit
+
+    from .tasks import make_post_thumbnail
+
+    for post in posts:
+        key = f'{get_cache_key(post.image.name)}:queued'
+        if cache.add(key, True, REQUEUE_TIMEOUT):
+            enqueue_on_commit(make_post_thumbnail, post.pk)
+
+
+def remember_thumbnail(image_name, thumbnail, variants):
+    """Кэширует метаданные миниатюры изображения; возвращает их."""
+    data = describe(
+        thumbnail.name, thumbnail.width, thumbnail.height, variants
+    )
+    cache.set(get_cache_key(image_name), data, None)
+    return data
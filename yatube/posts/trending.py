@@ -0,0 +1,76 @@
+"""Популярные записи и сообщества.
+
+Вклад события в рейтинг затухает экспоненциально: вес уменьшается вдвое
+за TRENDING_HALF_LIFE секунд. Вместо того чтобы пересчитывать все рейтинги
+с течением времени, хранится вес события, умноженный на
+2 ** ((t - epoch) / half_life): порядок записей при этом тот же, а каждое
+событие меняет одну строку. Команда compact_trending периодически
+переносит epoch на текущее время, домножая рейтинги на общий множитель,
+чтобы значения не переполняли float, и обнуляет угасшие.
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Subquery, Value
+from django.db.models.functions import Coalesce, Least, Power
+
+from .models import Group, Post, TrendingEpoch
+
+EPOCH_ID = 1
+# Защита от переполнения, если compact_trending давно не запускалась
+MAX_EXPONENT = 512.0
+
+
+def get_increment(weight, now=None):
+    """Вес события в единицах текущей точки отсчёта; epoch читается
+    подзапросом в том же UPDATE, чтобы не расходиться с compact()."""
+    now = time.time() if now is None else now
+    epoch = TrendingEpoch.objects.filter(pk=EPOCH_ID).values('timestamp')
+    half_life = Value(float(settings.TRENDING_HALF_LIFE))
+    exponent = (Value(now) - Coalesce(Subquery(epoch), Value(now))) / half_life
+    return Value(float(weight)) * Power(
+        Value(2.0), Least(exponent, Value(MAX_EXPONENT))
+    )
+
+
+def bump(post_id, group_id=None, weight=1, now=None):
+    increment = get_increment(weight, now)
+    Post.objects.filter(pk=post_id).update(
+        trending_score=F('trending_score') + increment
+    )
+    if group_id is not None:
+        Group.objects.filter(pk=group_id).update(
+            trending_score=F('trending_score') + increment
+        )
+
+
+def compact(now=None):
+    """Переносит точку отсчёта на now и обнуляет угасшие рейтинги."""
+    now = time.time() if now is None else now
+    with transaction.atomic():
+        epoch, _ = TrendingEpoch.objects.select_for_update().get_or_create(
+            pk=EPOCH_ID, defaults={'timestamp': now}
+        )
+        factor = 2.0 ** ((epoch.timestamp - now) / settings.TRENDING_HALF_LIFE)
+        for model in (Post, Group):
+            scored = model.objects.filter(trending_score__gt=0)
+            scored.update(trending_score=F('trending_score') * factor)
+            scored.filter(
+                trending_score__lt=settings.TRENDING_MIN_SCORE
+            ).update(trending_score=0)
+        epoch.timestamp = now
+        epoch.save(update_fields=['timestamp'])
+
+
+def trending_posts(group=None):
+    posts = Post.objects.for_feed().filter(trending_score__gt=0)
+    if group is not None:
+        posts = posts.filter(group=group)
+    return posts.order_by('-trending_score', '-pub_date')
+
+
+def trending_groups(limit=10):
+    return Group.objects.filter(
+        trending_score__gt=0
+    ).order_by('-trending_score')[:limit]
@@ -5,7 +5,16 @@ from . import views
 urlpatterns = [
     path('new/', views.new_post, name='new_post'),
     path('group/<slug:slug>/', views.group_posts, name='group_detail'),
+    path('group/<slug:slug>/trending/', views.group_trending,
+         name='group_trending'),
     path('follow/', views.follow_index, name="follow_index"),
+    path('trending/', views.trending, name='trending'),
+    path('feeds/<str:kind>/', views.index_feed, name='index_feed'),
+    path('feeds/<str:kind>/group/<slug:slug>/', views.group_posts_feed,
+         name='group_feed'),
+    path('feeds/<str:kind>/author/<str:username>/', views.profile_feed,
+         name='profile_feed'),
+    path('api/new-since/', views.new_posts_since, name='new_posts_since'),
     path('', views.index, name='index'),
     path('', views.index, name='index'),
     path('<str:username>/', views.profile, name='profile'),
@@ -14,6 +23,8 @@ urlpatterns = [
          name='post_edit'),
     path('<str:username>/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
+    path('<str:username>/<int:post_id>/like/', views.post_like,
+         name='post_like'),
     path('<str:username>/follow/',
          views.profile_follow, name='profile_follow'),
     path('<str:username>/unfollow/',
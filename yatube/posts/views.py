@@ -1,19 +1,69 @@
+from functools import wraps
+
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse
 from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition, require_POST
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
+
+from tasks.queue import enqueue_on_commit
+from yatube.async_utils import async_view
 
+from .archive import author_feed, get_archived_post, group_feed
+from .authors import get_author_card
+from .counters import count_view
+from .feeds import FEED_TYPES, feed_response, get_etag, get_last_modified
 from .forms import PostForm, CommentForm
-from .models import Group, Post, User, Comment, Follow
+from .likes import attach_likes, like_post, unlike_post
+from .longpoll import FEEDS, get_new_posts, parse_cursor
+from .models import (
+    Group, Post, User, Comment, Follow, attach_card_data
+)
+from .recommendations import get_recommendations
+from .signals import post_edited
+from .tasks import make_post_thumbnail
+from .throttling import rate_limit
+from .trending import trending_groups, trending_posts
 from yatube.settings import PER_PAGE
 
 
-@cache_page(20)
+def cache_page_per_session(timeout):
+    """cache_page, у которого вошедший пользователь получает свою копию
+    страницы по ключу сессии: карточки содержат его отметки «нравится»
+    и CSRF-токен. Иначе всем отдавалась бы копия первого посетителя, а
+    чужой токен отклонялся бы с 403."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def view(request, *args, **kwargs):
+            key_prefix = ''
+            if request.user.is_authenticated:
+                key_prefix = f'session:{request.session.session_key}'
+            cached_view = cache_page(timeout, key_prefix=key_prefix)(
+                view_func
+            )
+            return cached_view(request, *args, **kwargs)
+        return view
+    return decorator
+
+
+def prepare_cards(posts, user):
+    """Счётчики, миниатюры и отметки для всех карточек страницы - по
+    запросу на страницу, а не на карточку."""
+    attach_card_data(posts)
+    attach_likes(posts, user)
+
+
+@async_view
+@cache_page_per_session(20)
 def index(request):
-    post_list = Post.objects.select_related('group').all()
+    post_list = Post.objects.for_feed()
     paginator = Paginator(post_list, PER_PAGE)
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
+    prepare_cards(page.object_list, request.user)
     return render(
         request,
         'index.html',
@@ -21,75 +71,112 @@ def index(request):
     )
 
 
+@async_view
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group)
-    paginator = Paginator(posts, PER_PAGE)
+    paginator = Paginator(group_feed(group), PER_PAGE)
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
+    prepare_cards(page.object_list, request.user)
     return render(request, 'group.html', {'group': group, 'page': page})
 
 
+@async_view
+@cache_page_per_session(60)
+def trending(request):
+    paginator = Paginator(trending_posts(), PER_PAGE)
+    page = paginator.get_page(request.GET.get('page'))
+    prepare_cards(page.object_list, request.user)
+    return render(request, 'trending.html', {
+        'page': page,
+        'groups': trending_groups(),
+    })
+
+
+@async_view
+def group_trending(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    paginator = Paginator(trending_posts(group), PER_PAGE)
+    page = paginator.get_page(request.GET.get('page'))
+    prepare_cards(page.object_list, request.user)
+    return render(request, 'trending.html', {'group': group, 'page': page})
+
+
+@async_view
 def profile(request, username):
     user = request.user
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    paginator = Paginator(posts, PER_PAGE)
+    author = get_author_card(username)
+    if author is None:
+        raise Http404
+    paginator = Paginator(author_feed(author), PER_PAGE)
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
-    count = paginator.count
+    prepare_cards(page.object_list, request.user)
     if request.user.is_authenticated:
         following = Follow.objects.filter(user=user, author=author).exists()
     else:
         following = False
-    followers = Follow.objects.filter(author=author).count()
-    followings = Follow.objects.filter(user=author).count()
     return render(
         request, 'profile.html', {
             'author': author,
             'page': page,
-            'count': count,
+            'count': author.posts_count,
             'following': following,
-            'followings': followings,
-            'followers': followers
+            'followings': author.followings_count,
+            'followers': author.followers_count,
+            'recommendations': get_recommendations(user),
         }
     )
 
 
+@async_view
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post.objects.select_related('author'),
-                             id=post_id, author__username=username)
-    count = Post.objects.select_related('author').filter(
-        author__username=username).count()
-    author = post.author
-    form = CommentForm()
-    comments = Comment.objects.select_related('post').filter(post__id=post_id)
-    followers = Follow.objects.filter(author=author).count()
-    followings = Follow.objects.filter(user=author).count()
+    post = Post.objects.select_related('author', 'group').filter(
+        id=post_id, author__username=username
+    ).first() or get_archived_post(username, post_id)
+    if post is None:
+        raise Http404
+    post.views_count = count_view(request, post)
+    author = get_author_card(username)
+    form = None if post.is_archived else CommentForm()
+    comments = post.comments.select_related('author')
     return render(
         request, 'post.html', {
             'post': post,
-            'count': count,
+            'count': author.posts_count,
             'author': author,
             'comments': comments,
             'form': form,
-            'followings': followings,
-            'followers': followers
+            'followings': author.followings_count,
+            'followers': author.followers_count
         }
     )
 
 
 @login_required
+@rate_limit('new_post')
 def new_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        if post.image:
+            enqueue_on_commit(make_post_thumbnail, post.pk)
         return redirect('index')
     return render(request, 'newpost.html', {'form': form})
 
 
+def get_version(value):
+    """Версия записи, которую видел автор, открывая форму. Без поля или с
+    мусором в нём берётся первая версия: такая правка пройдёт, только если
+    запись с тех пор никто не менял, иначе форма вернётся автору."""
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
 @login_required
 def post_edit(request, username, post_id):
     if request.user.username != username:
@@ -99,10 +186,27 @@ def post_edit(request, username, post_id):
     form = PostForm(
         request.POST or None, files=request.FILES or None, instance=post
     )
+    if request.method != 'POST':
+        version = post.version
+    else:
+        version = get_version(request.POST.get('version'))
     if form.is_valid():
-        post = form.save()
-        return redirect('post', username=username, post_id=post_id)
-    return render(request, 'postedit.html', {'form': form, 'post': post})
+        changed = form.changed_data
+        if not changed:
+            return redirect('post', username=username, post_id=post_id)
+        if form.save(commit=False).save_changes(changed, version):
+            post_edited.send(sender=Post, instance=post, changed=changed)
+            return redirect('post', username=username, post_id=post_id)
+        form.add_error(None, 'Запись изменили, пока вы её редактировали. '
+                             'Проверьте текст и сохраните ещё раз.')
+        version = Post.objects.filter(pk=post_id).values_list(
+            'version', flat=True
+        ).first()
+    return render(request, 'postedit.html', {
+        'form': form,
+        'post': post,
+        'version': version,
+    })
 
 
 def page_not_found(request, exception):
@@ -119,10 +223,10 @@ def server_error(request):
 
 
 @login_required
+@rate_limit('add_comment')
 def add_comment(request, username, post_id):
-    post = Post.objects.select_related('author').get(
-        id=post_id, author__username=username
-    )
+    post = get_object_or_404(Post.objects.select_related('author'),
+                             id=post_id, author__username=username)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
@@ -130,7 +234,9 @@ def add_comment(request, username, post_id):
         comment.post = post
         comment.save()
         return redirect('post', username=username, post_id=post_id)
-    comments = Comment.objects.select_related('post').filter(post__id=post_id)
+    comments = Comment.objects.select_related('author').filter(
+        post__id=post_id
+    )
     return render(request, 'post.html',
                   {'post': post, 'comments': comments, 'form': form})
 
@@ -138,14 +244,38 @@ def add_comment(request, username, post_id):
 @login_required
 def follow_index(request):
     user = request.user
-    posts = Post.objects.filter(author__following__user=user)
+    posts = Post.objects.for_feed().filter(author__following__user=user)
     paginator = Paginator(posts, PER_PAGE)
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
-    return render(request, 'follow.html', {'page': page})
+    prepare_cards(page.object_list, request.user)
+    return render(request, 'follow.html', {
+        'page': page,
+        'recommendations': get_recommendations(user),
+    })
+
+
+@login_required
+@require_POST
+@rate_limit('like')
+def post_like(request, username, post_id):
+    post = get_object_or_404(
+        Post, id=post_id, author__username=username
+    )
+    if request.POST.get('action') == 'unlike':
+        unlike_post(request.user, post)
+    else:
+        like_post(request.user, post)
+    next_url = request.POST.get('next')
+    if not url_has_allowed_host_and_scheme(
+        next_url, {request.get_host()}, request.is_secure()
+    ):
+        next_url = post.get_absolute_url()
+    return redirect(next_url)
 
 
 @login_required
+@rate_limit('follow', methods=('GET', 'POST'))
 def profile_follow(request, username):
     user = request.user
     author = get_object_or_404(User, username=username)
@@ -155,8 +285,82 @@ def profile_follow(request, username):
 
 
 @login_required
+@rate_limit('follow', methods=('GET', 'POST'))
 def profile_unfollow(request, username):
     user = request.user
     author = get_object_or_404(User, username=username)
     Follow.objects.filter(user=user, author=author).delete()
     return redirect('profile', username)
+
+
+def new_posts_since(request):
+    feed = request.GET.get('feed', 'index')
+    if feed not in FEEDS:
+        return JsonResponse({'error': 'unknown feed'}, status=400)
+    user_id = None
+    if feed == 'follow':
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'login required'}, status=403)
+        user_id = request.user.pk
+    cursor = parse_cursor(request.GET.get('cursor'))
+    return JsonResponse(get_new_posts(cursor, user_id))
+
+
+FEED_POSTS = Post.objects.select_related('author', 'group')
+
+
+def get_feed_source(kind, slug=None, username=None):
+    """Ключ ленты и её записи; без запросов к БД."""
+    if kind not in FEED_TYPES:
+        raise Http404
+    if slug is not None:
+        return f'group:{slug}', FEED_POSTS.filter(group__slug=slug)
+    if username is not None:
+        return (f'author:{username}',
+                FEED_POSTS.filter(author__username=username))
+    return 'index', FEED_POSTS.all()
+
+
+def feed_etag(request, kind, **kwargs):
+    key, _ = get_feed_source(kind, **kwargs)
+    return get_etag(kind, key)
+
+
+def feed_last_modified(request, kind, **kwargs):
+    key, posts = get_feed_source(kind, **kwargs)
+    return get_last_modified(kind, key, posts)
+
+
+feed_condition = condition(
+    etag_func=feed_etag, last_modified_func=feed_last_modified
+)
+
+
+@feed_condition
+def index_feed(request, kind):
+    key, posts = get_feed_source(kind)
+    return feed_response(
+        request, kind, key, posts, 'Yatube', reverse('index'),
+        'Последние обновления на сайте'
+    )
+
+
+@feed_condition
+def group_posts_feed(request, kind, slug):
+    group = get_object_or_404(Group, slug=slug)
+    key, posts = get_feed_source(kind, slug=slug)
+    return feed_response(
+        request, kind, key, posts, f'Yatube: {group.title}',
+        group.get_absolute_url(), group.description
+    )
+
+
+@feed_condition
+def profile_feed(request, kind, username):
+    author = get_object_or_404(User, username=username)
+    key, posts = get_feed_source(kind, username=username)
+    return feed_response(
+        request, kind, key, posts, f'Yatube: @{username}',
+        reverse('profile', args=[username]),
+        f'Записи {author.get_full_name() or username}'
+    )
@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks.queue import claim_jobs, run_job
+
+
+def init_process():
+    django.setup()
+    # Соединения родителя закрыты до fork; свои процесс откроет сам
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи из очереди tasks.Job'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument(
+            '--pool', choices=('thread', 'process'), default='thread'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться',
+        )
+
+    def get_executor(self, pool, concurrency):
+        if pool == 'process':
+            # Соединения с БД нельзя разделять между процессами, а пул
+            # порождает их при первой отправке задачи, когда claim_jobs
+            # уже открыл соединение родителя. Поэтому процессы
+            # запускаются сразу, пока соединения закрыты.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                concurrency, initializer=init_process
+            )
+            executor.submit(int).result()
+            return executor
+        return ThreadPoolExecutor(concurrency)
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        with self.get_executor(options['pool'], concurrency) as executor:
+            while True:
+                pks = claim_jobs(concurrency * 2)
+                if pks:
+                    list(executor.map(run_job, pks))
+                    self.stdout.write(f'Выполнено задач: {len(pks)}')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
@@ -0,0 +1,124 @@
+import json
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+def task(func):
+    """Регистрирует функцию как фоновую задачу."""
+    func.task_name = f'{func.__module__}.{func.__name__}'
+    TASKS[func.task_name] = func
+    return func
+
+
+def get_task(name):
+    if name not in TASKS:
+        import_string(name)
+    return TASKS[name]
+
+
+def enqueue(func, *args, max_attempts=None, delay=0, **kwargs):
+    return Job.objects.create(
+        name=func.task_name,
+        payload=json.dumps({'args': args, 'kwargs': kwargs}),
+        max_attempts=max_attempts or settings.TASKS_MAX_ATTEMPTS,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_on_commit(func, *args, **kwargs):
+    """Ставит задачу в очередь после фиксации текущей транзакции."""
+    transaction.on_commit(lambda: enqueue(func, *args, **kwargs))
+
+
+def enqueue_once(func, delay=0):
+    """Ставит задачу без аргументов, если она ещё не ждёт в очереди;
+    с delay все вызовы за это время выполняются одним запуском."""
+    if Job.objects.filter(name=func.task_name, status=Job.QUEUED).exists():
+        return None
+    return enqueue(func, delay=delay)
+
+
+def enqueue_once_on_commit(func, delay=0):
+    transaction.on_commit(lambda: enqueue_once(func, delay=delay))
+
+
+def get_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def requeue_expired(now):
+    """Возвращает в очередь задачи, чья аренда истекла; задачи без
+    оставшихся попыток помечает ошибкой."""
+    expired = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.TASKS_LEASE),
+    )
+    values = {
+        'locked_at': None, 'locked_by': '',
+        'last_error': 'Аренда истекла: воркер не завершил задачу',
+    }
+    expired.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, **values
+    )
+    return expired.update(status=Job.QUEUED, run_at=now, **values)
+
+
+def claim_jobs(limit):
+    now = timezone.now()
+    requeue_expired(now)
+    pks = Job.objects.filter(
+        status=Job.QUEUED, run_at__lte=now
+    ).values_list('pk', flat=True)[:limit]
+    claimed = []
+    worker = get_worker_id()
+    for pk in pks:
+        updated = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, attempts=F('attempts') + 1,
+            locked_at=now, locked_by=worker,
+        )
+        if updated:
+            claimed.append(pk)
+    return claimed
+
+
+def get_retry_delay(attempts):
+    delay = settings.TASKS_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.TASKS_MAX_RETRY_DELAY))
+
+
+def run_job(pk):
+    job = Job.objects.get(pk=pk)
+    try:
+        args, kwargs = job.get_arguments()
+        get_task(job.name)(*args, **kwargs)
+    except Exception:
+        logger.exception('Задача %s завершилась ошибкой', job)
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+        else:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + get_retry_delay(job.attempts)
+        job.locked_at, job.locked_by = None, ''
+        job.save(update_fields=[
+            'status', 'run_at', 'last_error', 'locked_at', 'locked_by'
+        ])
+    else:
+        job.delete()
+    finally:
+        close_old_connections()
@@ -0,0 +1,95 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from tasks.models import Job
+from tasks.queue import (
+    claim_jobs, enqueue, enqueue_on_commit, enqueue_once, run_job, task
+)
+
+CALLS = []
+
+
+@task
+def remember(value, suffix=''):
+    CALLS.append(f'{value}{suffix}')
+
+
+@task
+def broken():
+    raise RuntimeError('Ошибка задачи')
+
+
+class QueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_run_job_success_deletes_job(self):
+        job = enqueue(remember, 'a', suffix='!')
+        self.assertEqual(claim_jobs(10), [job.pk])
+        run_job(job.pk)
+        self.assertEqual(CALLS, ['a!'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_claimed_job_not_claimed_twice(self):
+        enqueue(remember, 'a')
+        self.assertEqual(len(claim_jobs(10)), 1)
+        self.assertEqual(claim_jobs(10), [])
+
+    def test_expired_lease_requeued(self):
+        job = enqueue(remember, 'a', max_attempts=2)
+        claim_jobs(10)
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(claim_jobs(10), [job.pk])
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(claim_jobs(10), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+    def test_failed_job_retried_with_backoff(self):
+        job = enqueue(broken, max_attempts=2)
+        claim_jobs(10)
+        run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('Ошибка задачи', job.last_error)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        claim_jobs(10)
+        run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_enqueue_on_commit_waits_for_transaction(self):
+        enqueue_on_commit(remember, 'a')
+        self.assertFalse(Job.objects.exists())
+
+    def test_enqueue_once_skips_queued_job(self):
+        job = enqueue_once(broken, delay=60)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIsNone(enqueue_once(broken))
+        Job.objects.update(status=Job.RUNNING)
+        self.assertIsNotNone(enqueue_once(broken))
+        self.assertEqual(Job.objects.count(), 2)
+
+
+class WorkerCommandTests(TransactionTestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_worker_drains_queue(self):
+        for value in range(3):
+            enqueue(remember, value)
+        call_command('runworker', once=True, concurrency=2, stdout=StringIO())
+        self.assertEqual(sorted(CALLS), ['0', '1', '2'])
+        self.assertFalse(Job.objects.exists())
@@ -3,3 +3,14 @@ from django.apps import AppConfig
 
 class UsersConfig(AppConfig):
     name = 'users'
+
+    def ready(self):
+        from django.contrib.auth.password_validation import (
+            get_default_password_validators
+        )
+
+        from . import checks, signals  # noqa: F401
+
+        # Валидаторы и список паролей загружаются при старте процесса,
+        # а не на первой регистрации
+        get_default_password_validators()
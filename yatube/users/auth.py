@@ -0,0 +1,85 @@
+"""Загрузка request.user из кэша.
+
+В кэше по id из сессии лежат только поля из USER_FIELDS и хеш сессии,
+но не хеш пароля. Из них собирается экземпляр, у которого остальные
+поля отложены и загружаются из базы при обращении, а save() пишет
+только загруженные поля. При каждом запросе хеш сессии сверяется, как
+это делает django.contrib.auth, поэтому смена пароля по-прежнему
+завершает остальные сессии. Кэш сбрасывается сигналами при сохранении
+и удалении пользователя.
+"""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import get_user_model
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import router
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+USER_FIELDS = (
+    'id', 'username', 'first_name', 'last_name', 'email',
+    'is_active', 'is_staff', 'is_superuser',
+)
+
+
+def get_user_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def session_hash_matches(request, data):
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    return session_hash and constant_time_compare(
+        session_hash, data['session_hash']
+    )
+
+
+def cache_user(user):
+    data = {name: getattr(user, name) for name in USER_FIELDS}
+    data['session_hash'] = user.get_session_auth_hash()
+    cache.set(get_user_key(user.pk), data, settings.AUTH_USER_TIMEOUT)
+
+
+def build_user(data):
+    model = get_user_model()
+    # from_db ждёт значения в порядке полей модели
+    names = [
+        field.attname for field in model._meta.concrete_fields
+        if field.attname in USER_FIELDS
+    ]
+    return model.from_db(
+        router.db_for_read(model), names, [data[name] for name in names]
+    )
+
+
+def get_cached_user(request):
+    if not hasattr(request, '_cached_user'):
+        user_id = request.session.get(auth.SESSION_KEY)
+        data = None
+        if user_id is not None:
+            data = cache.get(get_user_key(user_id))
+        if data is None:
+            user = auth.get_user(request)
+            if user.is_authenticated:
+                cache_user(user)
+        elif session_hash_matches(request, data):
+            user = build_user(data)
+        else:
+            request.session.flush()
+            user = AnonymousUser()
+        request._cached_user = user
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware без запроса к auth_user, пока пользователь
+    есть в кэше."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
+
+
+def invalidate_user(user_id):
+    cache.delete(get_user_key(user_id))
@@ -0,0 +1,21 @@
+from django.contrib.auth.hashers import get_hasher
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.security)
+def check_password_hasher(app_configs, **kwargs):
+    """Основной хешер должен загружаться: иначе не войти ни с каким
+    паролем."""
+    hasher = get_hasher('default')
+    if hasher.library is None:
+        return []
+    try:
+        hasher._load_library()
+    except ValueError as error:
+        return [Error(
+            str(error),
+            hint='Установите библиотеку или смените '
+                 'YATUBE_PASSWORD_HASHER.',
+            id='users.E001',
+        )]
+    return []
@@ -0,0 +1,30 @@
+import timeit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+PASSWORD = 'correct horse battery staple'
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время проверки пароля хешерами из PASSWORD_HASHERS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=5)
+
+    def handle(self, *args, **options):
+        number = options['number']
+        for path in settings.PASSWORD_HASHERS:
+            hasher = import_string(path)()
+            try:
+                encoded = hasher.encode(PASSWORD, hasher.salt())
+            except ValueError as error:
+                self.stdout.write(f'{hasher.algorithm:16} недоступен: {error}')
+                continue
+            elapsed = timeit.timeit(
+                lambda: hasher.verify(PASSWORD, encoded), number=number
+            )
+            self.stdout.write(
+                f'{hasher.algorithm:16} {elapsed * 1000 / number:7.1f} мс'
+            )
@@ -0,0 +1,46 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+def clear_expired(model, batch_size, pause=0):
+    """Удаляет истёкшие сессии пачками по первичному ключу, не блокируя
+    таблицу одним огромным DELETE."""
+    deleted = 0
+    while True:
+        keys = list(
+            model.objects.filter(expire_date__lt=timezone.now()).values_list(
+                'session_key', flat=True
+            )[:batch_size]
+        )
+        if not keys:
+            return deleted
+        deleted += model.objects.filter(session_key__in=keys).delete()[0]
+        if pause:
+            time.sleep(pause)
+
+
+class Command(BaseCommand):
+    help = 'Удаляет истёкшие сессии пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0)
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            try:
+                store.clear_expired()
+            except NotImplementedError:
+                self.stderr.write(
+                    'Хранилище сессий не поддерживает очистку'
+                )
+            return
+        deleted = clear_expired(
+            store.get_model_class(), options['batch_size'], options['pause']
+        )
+        self.stdout.write(f'Удалено сессий: {deleted}')
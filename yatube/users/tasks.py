@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+from django.template.loader import render_to_string
+
+from tasks.queue import task
+
+User = get_user_model()
+
+WELCOME_SUBJECT = 'Добро пожаловать в Yatube'
+
+
+@task
+def send_welcome_email(user_id):
+    user = User.objects.filter(pk=user_id).only(
+        'username', 'email'
+    ).first()
+    if user is None or not user.email:
+        return
+    body = render_to_string('users/welcome.txt', {
+        'username': user.username,
+        'site_url': settings.SITE_URL,
+    })
+    send_mail(WELCOME_SUBJECT, body, None, [user.email])
@@ -0,0 +1,89 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from users.auth import get_user_key
+
+User = get_user_model()
+
+
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='reader', password='secret-pass'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.login(username='reader', password='secret-pass')
+
+    def test_warm_request_skips_session_and_user_queries(self):
+        url = reverse('about:author')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_password_change_ends_other_sessions(self):
+        url = reverse('about:author')
+        self.client.get(url)
+        self.user.set_password('new-secret')
+        self.user.save()
+        response = self.client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_cache_has_no_password_hash(self):
+        self.client.get(reverse('about:author'))
+        data = cache.get(get_user_key(self.user.pk))
+        self.assertNotIn('password', data)
+        self.assertNotIn(self.user.password, data.values())
+
+    def test_cached_user_loads_and_keeps_password(self):
+        url = reverse('about:author')
+        self.client.get(url)
+        user = self.client.get(url).context['user']
+        user.first_name = 'Читатель'
+        user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Читатель')
+        self.assertTrue(self.user.check_password('secret-pass'))
+        self.assertEqual(user.password, self.user.password)
+
+    def test_stale_hash_in_cache_is_rejected(self):
+        self.client.get(reverse('about:author'))
+        key = get_user_key(self.user.pk)
+        data = cache.get(key)
+        data['session_hash'] = 'stale'
+        cache.set(key, data)
+        response = self.client.get(reverse('about:author'))
+        self.assertFalse(response.context['user'].is_authenticated)
+
+
+class ClearSessionsTests(TestCase):
+    def test_expired_sessions_removed_in_batches(self):
+        past = timezone.now() - timedelta(days=1)
+        future = timezone.now() + timedelta(days=1)
+        Session.objects.bulk_create(
+            [Session(session_key=f'old{n}', session_data='', expire_date=past)
+             for n in range(7)]
+            + [Session(session_key='live', session_data='',
+                       expire_date=future)]
+        )
+        out = StringIO()
+        with self.assertNumQueries(7):
+            call_command('clear_sessions', batch_size=3, stdout=out)
+        self.assertIn('7', out.getvalue())
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['live']
+        )
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, get_hasher, make_password
+)
+from django.contrib.auth.password_validation import (
+    get_default_password_validators
+)
+from django.core import mail
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Recommendation
+from tasks.models import Job
+from tasks.queue import run_job
+from users.checks import check_password_hasher
+from users.validators import CommonPasswordValidator
+
+User = get_user_model()
+
+
+class SignUpTests(TestCase):
+    def test_common_password_list_is_shared(self):
+        validators = [
+            validator for validator in get_default_password_validators()
+            if isinstance(validator, CommonPasswordValidator)
+        ]
+        self.assertEqual(len(validators), 1)
+        self.assertIsInstance(validators[0].passwords, frozenset)
+        self.assertIs(CommonPasswordValidator().passwords,
+                      validators[0].passwords)
+
+    def test_signup_defers_welcome_work(self):
+        author = User.objects.create_user(username='author')
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = Client().post(reverse('signup'), {
+                'username': 'newbie',
+                'email': 'newbie@example.com',
+                'password1': 'Xy7-unusual-pass',
+                'password2': 'Xy7-unusual-pass',
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        jobs = list(Job.objects.order_by('pk'))
+        self.assertEqual(
+            [job.name for job in jobs],
+            ['users.tasks.send_welcome_email',
+             'posts.tasks.recommend_popular_authors']
+        )
+        for job in jobs:
+            run_job(job.pk)
+        self.assertEqual(mail.outbox[0].to, ['newbie@example.com'])
+        self.assertEqual(
+            list(Recommendation.objects.filter(
+                user__username='newbie'
+            ).values_list('author__username', flat=True)),
+            ['author']
+        )
+
+    def test_login_rehashes_with_preferred_hasher(self):
+        User.objects.create(
+            username='old',
+            password=make_password('old-secret', hasher='pbkdf2_sha1'),
+        )
+        Client().login(username='old', password='old-secret')
+        user = User.objects.get(username='old')
+        self.assertTrue(user.password.startswith(
+            get_hasher('default').algorithm + '$'
+        ))
+
+    def test_default_hasher_passes_check(self):
+        self.assertEqual(check_password_hasher(None), [])
+
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.Argon2PasswordHasher'
+    ])
+    def test_missing_hasher_library_is_reported(self):
+        with mock.patch.object(
+            Argon2PasswordHasher, 'library', 'missing_hasher_library'
+        ):
+            errors = check_password_hasher(None)
+        self.assertEqual([error.id for error in errors], ['users.E001'])
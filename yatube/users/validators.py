@@ -0,0 +1,18 @@
+from functools import lru_cache
+
+from django.contrib.auth import password_validation
+
+
+@lru_cache(maxsize=None)
+def load_password_list(path):
+    """Список распространённых паролей читается из gzip один раз на процесс."""
+    return frozenset(
+        password_validation.CommonPasswordValidator(path).passwords
+    )
+
+
+class CommonPasswordValidator(password_validation.CommonPasswordValidator):
+    def __init__(self, password_list_path=(
+            password_validation.CommonPasswordValidator
+            .DEFAULT_PASSWORD_LIST_PATH)):
+        self.passwords = load_password_list(password_list_path)
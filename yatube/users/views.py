@@ -1,10 +1,20 @@
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 
+from posts.tasks import recommend_popular_authors
+from tasks.queue import enqueue_on_commit
+
 from .forms import CreationForm
+from .tasks import send_welcome_email
 
 
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('login')
     template_name = 'signup.html'
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        enqueue_on_commit(send_welcome_email, self.object.pk)
+        enqueue_on_commit(recommend_popular_authors, self.object.pk)
+        return response
@@ -0,0 +1,20 @@
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+django_application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+from posts import longpoll  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan' or (
+            scope['type'] == 'http'
+            and scope['path'] == settings.LONGPOLL_PATH):
+        await longpoll.application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
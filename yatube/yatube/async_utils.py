@@ -0,0 +1,51 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from django.conf import settings
+from django.db import close_old_connections
+
+executor = ThreadPoolExecutor(
+    settings.ASYNC_DB_THREADS, thread_name_prefix='yatube-db'
+)
+
+
+def call_db(func, *args, **kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(func, *args, **kwargs):
+    """Выполняет блокирующий вызов (ORM, шаблоны) в ограниченном пуле
+    потоков, не занимая цикл событий."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, partial(call_db, func, *args, **kwargs)
+    )
+
+
+def render_view(view_func, request, *args, **kwargs):
+    response = view_func(request, *args, **kwargs)
+    if callable(getattr(response, 'render', None)):
+        response.render()
+    return response
+
+
+def async_view(view_func):
+    """Делает представление асинхронным при включённом ASYNC_VIEWS.
+
+    Тело представления целиком, вместе с отрисовкой шаблона, выполняется
+    в пуле run_sync: ленивые запросы в шаблонах тоже обращаются к БД.
+    """
+    if not settings.ASYNC_VIEWS:
+        return view_func
+
+    @wraps(view_func)
+    async def view(request, *args, **kwargs):
+        return await run_sync(
+            render_view, view_func, request, *args, **kwargs
+        )
+    return view
@@ -0,0 +1,149 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied, SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.utils.module_loading import import_string
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def public_media(request, path):
+    """Проверка доступа по умолчанию: все файлы MEDIA_ROOT публичны."""
+    return True
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileRange:
+    """Часть открытого файла. fileno() сохраняется, поэтому WSGI-сервер
+    может отдать диапазон через sendfile с текущей позиции файла."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Один диапазон 'bytes=a-b' -> (начало, длина); None, если заголовок
+    не поддерживается и нужно отдать файл целиком."""
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = min(int(end), size)
+        if not length:
+            raise RangeNotSatisfiable
+        return size - length, length
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable
+    return start, end - start + 1
+
+
+def if_range_matches(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range is None:
+        return True
+    if if_range == etag:
+        return True
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def accel_response(path, full_path):
+    response = HttpResponse()
+    if settings.MEDIA_ACCEL == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_PREFIX + quote(path)
+        )
+    else:
+        response['X-Sendfile'] = full_path
+    return response
+
+
+def file_response(request, full_path, size, etag, last_modified):
+    file = open(full_path, 'rb')
+    content_range = None
+    if 'HTTP_RANGE' in request.META and if_range_matches(
+            request, etag, last_modified):
+        try:
+            content_range = parse_range(request.META['HTTP_RANGE'], size)
+        except RangeNotSatisfiable:
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    if content_range is None:
+        return FileResponse(file)
+    start, length = content_range
+    response = FileResponse(FileRange(file, start, length), status=206)
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{start + length - 1}/{size}'
+    return response
+
+
+def serve_media(request, path):
+    """Отдаёт файл из MEDIA_ROOT с поддержкой Range и условных запросов.
+
+    Байты передаются через FileResponse (sendfile на стороне WSGI-сервера)
+    или, при MEDIA_ACCEL, отдача поручается nginx/Apache.
+    """
+    if not import_string(settings.MEDIA_PERMISSION)(request, path):
+        raise PermissionDenied
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        if settings.MEDIA_ACCEL:
+            response = accel_response(path, full_path)
+        else:
+            response = file_response(
+                request, full_path, stat.st_size, etag, last_modified
+            )
+        content_type, _ = mimetypes.guess_type(full_path)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = settings.MEDIA_CACHE_CONTROL
+    return response
+
+
+def serve_sitemap(request, name):
+    """Карта сайта из MEDIA_ROOT/SITEMAP_DIR по адресу в корне сайта."""
+    return serve_media(request, f'{settings.SITEMAP_DIR}/{name}')
@@ -0,0 +1,252 @@
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import (
+    get_cache_key, get_max_age, patch_vary_headers
+)
+from django.utils.http import parse_etags
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/]+$')
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml|rss\+xml|atom\+xml)|'
+    r'image/svg\+xml)'
+)
+PROTECTED_BLOCKS = re.compile(
+    rb'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.S | re.I
+)
+HTML_COMMENT = re.compile(rb'<!--(?!\[if).*?-->', re.S)
+NEWLINE_SPACE = re.compile(rb'\s*\n\s*')
+SPACES = re.compile(rb'[ \t]{2,}')
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, кроме явно запрещённых q=0."""
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    encodings = set()
+    for value in header.split(','):
+        encoding, _, params = value.partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00'):
+            encodings.add(encoding.strip().lower())
+    return encodings
+
+
+def minify_html(content):
+    """Убирает комментарии и схлопывает пробелы вне pre, textarea,
+    script и style."""
+    parts = PROTECTED_BLOCKS.split(content)
+    result = []
+    # split() возвращает текст, блок целиком и имя тега по очереди
+    for index in range(0, len(parts), 3):
+        text = HTML_COMMENT.sub(b'', parts[index])
+        text = SPACES.sub(b' ', NEWLINE_SPACE.sub(b'\n', text))
+        result.append(text)
+        if index + 1 < len(parts):
+            result.append(parts[index + 1])
+    return b''.join(result)
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content)
+    return gzip.compress(content, compresslevel=6, mtime=0)
+
+
+class HybridMiddleware:
+    """Основа middleware для WSGI и ASGI.
+
+    Синхронный middleware в цепочке заставляет Django под ASGI обернуть
+    её целиком в один SyncToAsync(thread_sensitive=True), и все запросы
+    выполняются по очереди в одном потоке. Здесь при асинхронном
+    get_response __call__ становится корутиной, а блокирующая работа
+    уходит в общий пул потоков (thread_sensitive=False).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Тот же признак корутины, что ставит MiddlewareMixin
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def run_sync(self, func, *args):
+        return sync_to_async(func, thread_sensitive=False)(*args)
+
+
+class StaticFilesMiddleware(HybridMiddleware):
+    """Отдаёт файлы из STATIC_ROOT до сессий и аутентификации.
+
+    Файлы с хэшем в имени кэшируются браузером навсегда (immutable),
+    поддерживаются If-None-Match и сжатые копии .br/.gz.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.prefix = settings.STATIC_URL
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.acall(request)
+        if self.is_static(request):
+            response = self.serve(request, self.get_name(request))
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    async def acall(self, request):
+        if self.is_static(request):
+            response = await self.run_sync(
+                self.serve, request, self.get_name(request)
+            )
+            if response is not None:
+                return response
+        return await self.get_response(request)
+
+    def is_static(self, request):
+        return (request.method in ('GET', 'HEAD')
+                and request.path_info.startswith(self.prefix))
+
+    def get_name(self, request):
+        return request.path_info[len(self.prefix):]
+
+    def find_file(self, request, name):
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None, None, None
+        encodings = accepted_encodings(request)
+        for encoding, suffix in ENCODINGS:
+            if encoding in encodings:
+                try:
+                    return path + suffix, encoding, os.stat(path + suffix)
+                except OSError:
+                    pass
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None, None, None
+        if not os.path.isfile(path):
+            return None, None, None
+        return path, None, stat
+
+    def serve(self, request, name):
+        path, encoding, stat = self.find_file(request, name)
+        if path is None:
+            return None
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}-{encoding or "id"}"'
+        if HASHED_NAME.search(name):
+            cache_control = 'public, max-age=31536000, immutable'
+        else:
+            cache_control = f'public, max-age={settings.STATIC_MAX_AGE}'
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, 'rb'))
+            content_type, _ = mimetypes.guess_type(name)
+            response['Content-Type'] = (
+                content_type or 'application/octet-stream'
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class CompressionMiddleware(HybridMiddleware):
+    """Минификация HTML и сжатие ответов brotli/gzip.
+
+    Для страниц cache_page результат минификации и сжатия хранится в
+    кэше рядом со страницей: ключ - ключ страницы и её Expires, который
+    меняется при каждом пересоздании. Отдача закэшированной страницы не
+    минифицирует, не хэширует и не сжимает её заново.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.acall(request)
+        return self.process(request, self.get_response(request))
+
+    async def acall(self, request):
+        response = await self.get_response(request)
+        return await self.run_sync(self.process, request, response)
+
+    def process(self, request, response):
+        if (response.streaming or response.has_header('Content-Encoding')
+                or response.status_code != 200):
+            return response
+        content_type = response.get('Content-Type', '')
+        minify = (
+            settings.HTML_MINIFY and content_type.startswith('text/html')
+        )
+        encoding = None
+        if COMPRESSIBLE_TYPES.match(content_type):
+            patch_vary_headers(response, ('Accept-Encoding',))
+            encoding = self.choose_encoding(request)
+        if not minify and encoding is None:
+            return response
+        key = self.get_cache_key(request, response, encoding)
+        variant = cache.get(key) if key else None
+        if variant is None:
+            variant = self.build_variant(response.content, minify, encoding)
+            if key:
+                cache.set(key, variant, get_max_age(response))
+        content, encoding = variant
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        if encoding:
+            response['Content-Encoding'] = encoding
+            etag = response.get('ETag')
+            if etag and etag.startswith('"'):
+                response['ETag'] = 'W/' + etag
+        return response
+
+    def choose_encoding(self, request):
+        encodings = accepted_encodings(request)
+        if brotli is not None and 'br' in encodings:
+            return 'br'
+        if 'gzip' in encodings:
+            return 'gzip'
+        return None
+
+    def build_variant(self, content, minify, encoding):
+        """(тело, кодировка) после минификации и, если это выгодно,
+        сжатия."""
+        if minify:
+            content = minify_html(content)
+        if encoding and len(content) >= settings.COMPRESSION_MIN_SIZE:
+            compressed = compress(content, encoding)
+            if len(compressed) < len(content):
+                return compressed, encoding
+        return content, None
+
+    def get_cache_key(self, request, response, encoding):
+        """Ключ готового варианта страницы cache_page без чтения тела;
+        None для некэшируемых ответов."""
+        expires = response.get('Expires')
+        if not expires or not get_max_age(response):
+            return None
+        page_key = get_cache_key(request, method='GET', cache=cache)
+        if page_key is None:
+            return None
+        digest = hashlib.md5(f'{page_key}:{expires}'.encode()).hexdigest()
+        return f'compressed:{encoding or "identity"}:{digest}'
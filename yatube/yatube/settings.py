@@ -5,13 +5,13 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 # Quick-start development settings - unsuitable for production
-# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+# See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = '(w4v#wl+k!lb)g+!d^-3oy17f9c$r8c9sg1c%4cky+eha)ylmu'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get('YATUBE_DEBUG', '1') == '1'
 
 ALLOWED_HOSTS = [
     "localhost",
@@ -29,6 +29,8 @@ INSTALLED_APPS = [
     'about',
     'users',
     'posts',
+    'tasks.apps.TasksConfig',
+    'notifications',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -40,10 +42,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'yatube.middleware.StaticFilesMiddleware',
+    'yatube.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.auth.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -52,12 +56,21 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    # В production скомпилированные шаблоны хранятся в памяти процесса
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader',
+                         TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -70,10 +83,11 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
+ASGI_APPLICATION = 'yatube.asgi.application'
 
 
 # Database
-# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+# https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
 DATABASES = {
     'default': {
@@ -82,9 +96,11 @@ DATABASES = {
     }
 }
 
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
 
 # Password validation
-# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+# https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -94,16 +110,36 @@ AUTH_PASSWORD_VALIDATORS = [
         'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
     },
     {
-        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+        'NAME': 'users.validators.CommonPasswordValidator',
     },
     {
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
 ]
 
+# Первый хешер используется для новых паролей, остальные только проверяют
+# старые хеши; при входе пароль прозрачно перехешируется первым. Основной
+# хешер задаётся явно через YATUBE_PASSWORD_HASHER, чтобы он не менялся
+# от набора установленных пакетов; для Argon2 нужен argon2-cffi, что
+# проверяет users.E001. Сравнить стоимость хешеров на своём железе можно
+# командой manage.py bench_hashers.
+PASSWORD_HASHER = os.environ.get(
+    'YATUBE_PASSWORD_HASHER',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher'
+)
+PASSWORD_HASHERS = [PASSWORD_HASHER] + [
+    hasher for hasher in (
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    )
+    if hasher != PASSWORD_HASHER
+]
+
 
 # Internationalization
-# https://docs.djangoproject.com/en/2.2/topics/i18n/
+# https://docs.djangoproject.com/en/3.2/topics/i18n/
 
 LANGUAGE_CODE = 'ru'
 
@@ -117,13 +153,29 @@ USE_TZ = True
 
 
 # Static files (CSS, JavaScript, Images)
-# https://docs.djangoproject.com/en/2.2/howto/static-files/
+# https://docs.djangoproject.com/en/3.2/howto/static-files/
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
+if not DEBUG:
+    # Хэшированные имена и сжатые копии создаются при collectstatic
+    STATICFILES_STORAGE = 'yatube.storage.CompressedManifestStaticFilesStorage'
+# Время кэширования файлов статики без хэша в имени (секунды)
+STATIC_MAX_AGE = 60 * 60
+
+# Сжатие ответов: минимальный размер (байты) и минификация HTML
+COMPRESSION_MIN_SIZE = 200
+HTML_MINIFY = not DEBUG
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_CACHE_CONTROL = 'public, max-age=86400'
+# Проверка доступа к файлу: функция (request, path) -> bool
+MEDIA_PERMISSION = 'yatube.media.public_media'
+# Отдача файлов фронтенд-сервером: None, 'x-accel-redirect' (nginx, по
+# внутреннему location MEDIA_ACCEL_PREFIX) или 'x-sendfile' (Apache)
+MEDIA_ACCEL = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
 # Login
 
 LOGIN_URL = '/auth/login/'
@@ -135,11 +187,124 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
+# Адрес сайта для ссылок в письмах
+SITE_URL = 'http://katsmannn.pythonanywhere.com'
+
+# Сводки новых записей: период по умолчанию (секунды) и размер порции
+DIGEST_PERIOD = 24 * 60 * 60
+DIGEST_CHUNK_SIZE = 500
+
 
 PER_PAGE = 10
 
+# Хранилище сессий: cached_db по умолчанию, signed_cookies - без обращений
+# к БД вовсе (YATUBE_SESSION_ENGINE=django.contrib.sessions.backends....)
+SESSION_ENGINE = os.environ.get(
+    'YATUBE_SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db'
+)
+# Сколько секунд request.user живёт в кэше (сбрасывается сигналами)
+AUTH_USER_TIMEOUT = 60 * 60
+
+# Асинхронные представления (YATUBE_ASYNC_VIEWS=1, только под ASGI):
+# тело представления целиком выполняется в пуле из ASYNC_DB_THREADS
+# потоков. По умолчанию выключены: в замере под нагрузкой ASGI с ними
+# отдавал страницы медленнее WSGI (25 против 38 запросов в секунду, p99
+# 20,3 против 6,6 с), выигрыш есть только у длинного опроса, который
+# асинхронен и без них
+ASYNC_VIEWS = os.environ.get('YATUBE_ASYNC_VIEWS') == '1'
+ASYNC_DB_THREADS = 8
+
+# Long-poll "новые записи после курсора" (yatube.asgi): путь, максимальное
+# ожидание и интервал опроса БД в секундах
+LONGPOLL_PATH = '/api/new-since/'
+LONGPOLL_TIMEOUT = 25
+LONGPOLL_INTERVAL = 1
+
+# Очередь фоновых задач: число попыток и задержка между ними (секунды)
+TASKS_MAX_ATTEMPTS = 5
+TASKS_RETRY_DELAY = 10
+TASKS_MAX_RETRY_DELAY = 60 * 60
+# Срок аренды задачи воркером (секунды): должен превышать время самой
+# долгой задачи, иначе она будет выполнена повторно
+TASKS_LEASE = 30 * 60
+
+# Время жизни кэша карточки автора (секунды); сбрасывается сигналами
+AUTHOR_CARD_TIMEOUT = 24 * 60 * 60
+
+# Сколько авторов рекомендовать пользователю в блоке «Кого почитать»
+RECOMMENDATIONS_LIMIT = 10
+
+# Популярное: период полураспада веса события (секунды), веса комментария
+# и подписки, рейтинг, ниже которого compact_trending обнуляет запись
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_COMMENT_WEIGHT = 1
+TRENDING_FOLLOW_WEIGHT = 2
+TRENDING_MIN_SCORE = 0.01
+
+# RSS/Atom: число записей в ленте и время жизни кэша ленты (секунды);
+# кэш сбрасывается новой, изменённой или скрытой записью
+FEED_ITEMS = 50
+FEED_CACHE_TIMEOUT = 60 * 60
+
+# Карта сайта: каталог внутри MEDIA_ROOT, число id записей/авторов в одном
+# файле карты и задержка (секунды) пересборки: пока задача ждёт в очереди,
+# новые записи не ставят вторую
+SITEMAP_DIR = 'sitemaps'
+SITEMAP_CHUNK_SIZE = 10000
+SITEMAP_UPDATE_DELAY = 5 * 60
+
+# Просмотры: сколько последних записей посетителя помнить, чтобы не
+# считать повторные открытия, и как долго (секунды); в базу просмотры
+# переносит flush_views
+VIEWS_SEEN_SIZE = 50
+VIEWS_SEEN_TIMEOUT = 30 * 60
+# Срок (секунды) блокировки сбора просмотров на случай, если flush_views
+# упал, не сняв её
+VIEWS_FLUSH_LOCK_TIMEOUT = 60
+
+# Отметки «нравится»: запись, получившая за LIKES_HOT_WINDOW секунд не
+# меньше LIKES_HOT_THRESHOLD отметок, ведёт счётчик в LIKES_SHARDS частях
+# (распределение пересчитывает compact_likes)
+LIKES_SHARDS = 8
+LIKES_HOT_WINDOW = 60 * 60
+LIKES_HOT_THRESHOLD = 100
+
+# Записи старше этого срока (секунды) archive_posts переносит в архив
+ARCHIVE_AFTER = 2 * 365 * 24 * 60 * 60
+
+# Ограничение частоты запросов на запись: "<число>/<s|m|h|d>" на
+# пользователя и отдельные, более высокие пределы на адрес - за одним NAT
+# сидит много пользователей. Счётчик считает запросы в фиксированном окне
+# периода, поэтому на стыке двух окон проходит до двух пределов подряд.
+RATE_LIMITS = {
+    'new_post': '10/m',
+    'add_comment': '20/m',
+    'follow': '30/m',
+    'like': '60/m',
+}
+IP_RATE_LIMITS = {
+    'new_post': '100/m',
+    'add_comment': '200/m',
+    'follow': '300/m',
+    'like': '600/m',
+}
+# Сколько доверенных прокси (nginx перед приложением и т. п.) дописывают
+# X-Forwarded-For; при 0 адрес клиента - REMOTE_ADDR. Без этой настройки
+# за прокси у всех запросов один адрес, и IP_RATE_LIMITS становятся
+# общим пределом на весь сайт
+RATE_LIMIT_PROXY_COUNT = int(os.environ.get('YATUBE_PROXY_COUNT', '0'))
+
+# Кэш должен быть общим для всех процессов (memcached): на нём держатся
+# ограничения частоты, буфер просмотров и счётчики поколений. LocMemCache
+# по умолчанию у каждого процесса свой и годится только для разработки;
+# в работе YATUBE_CACHE_BACKEND=django.core.cache.backends.memcached.
+# PyMemcacheCache и YATUBE_CACHE_LOCATION=127.0.0.1:11211
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': os.environ.get(
+            'YATUBE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('YATUBE_CACHE_LOCATION', ''),
     }
 }
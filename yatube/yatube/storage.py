@@ -0,0 +1,48 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.txt', '.xml', '.json', '.html',
+    '.eot', '.ttf', '.otf',
+)
+MIN_COMPRESS_SIZE = 256
+
+
+def compress_file(path):
+    """Пишет рядом с файлом сжатые копии .gz и .br (если установлен
+    brotli), когда они меньше оригинала."""
+    with open(path, 'rb') as source:
+        content = source.read()
+    if len(content) < MIN_COMPRESS_SIZE:
+        return
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content)))
+    for suffix, compressed in variants:
+        if len(compressed) < len(content):
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хэшированные имена файлов плюс предварительно сжатые копии,
+    создаваемые при collectstatic."""
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(paths):
+            hashed_name = self.hashed_files.get(
+                self.hash_key(self.clean_name(name))
+            )
+            if (hashed_name and hashed_name.endswith(COMPRESSIBLE_EXTENSIONS)
+                    and self.exists(hashed_name)):
+                compress_file(self.path(hashed_name))
@@ -1,9 +1,10 @@
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.conf.urls import handler404, handler500
 from posts import views
+from yatube.media import serve_media, serve_sitemap
 
 handler404 = 'posts.views.page_not_found'  # noqa
 handler500 = 'posts.views.server_error'  # noqa
@@ -13,13 +14,15 @@ urlpatterns = [
     path('about/', include('about.urls', namespace='about')),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'),
+            serve_media, name='media'),
+    re_path(r'^(?P<name>sitemap(-[a-z]+-\d+)?\.xml)$', serve_sitemap,
+            name='sitemap'),
     path("", include("posts.urls")),
     path('/404', views.page_not_found),
     path('/500', views.server_error),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL,
-                          document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL,
                           document_root=settings.STATIC_ROOT)